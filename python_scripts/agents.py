@@ -6,12 +6,18 @@ Define agents com capacidades específicas que podem ser chamados pelo orquestra
 
 import os
 import json
+import bisect
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import functools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
-import anthropic
-import requests
+import prompt_caching
+from client_pool import get_client_pool
+from deadline import Deadline, DeadlineExceededError, bounded_client
 
 logger = logging.getLogger(__name__)
 
@@ -25,12 +31,30 @@ class AgentCapability:
     cost_multiplier: float  # Multiplicador de custo (1.0 = normal)
 
 
+@dataclass
+class AgentSpec:
+    """
+    Descrição barata de um agent registrado
+
+    O agent só é construído (clientes de API, configuração) no primeiro uso.
+    task_types permite descartar o agent na seleção sem construí-lo; vazio
+    significa que can_handle decide para qualquer tipo de tarefa.
+    """
+    name: str
+    factory: Callable[[], 'BaseAgent']
+    task_types: Tuple[str, ...] = ()
+
+
 class BaseAgent(ABC):
     """Classe base para todos os agents"""
     
+    # Tipos de tarefa que o agent pode atender (vazio: qualquer um, via can_handle)
+    TASK_TYPES: Tuple[str, ...] = ()
+    
     def __init__(self, name: str, capabilities: List[AgentCapability]):
         self.name = name
         self.capabilities = capabilities
+        self._capabilities_by_name = {cap.name: cap for cap in capabilities}
         self.logger = logging.getLogger(f"Agent.{name}")
     
     @abstractmethod
@@ -42,24 +66,56 @@ class BaseAgent(ABC):
         pass
     
     @abstractmethod
-    def execute(self, input_text: str, context: Optional[Dict] = None) -> Dict[str, Any]:
+    def execute(self, input_text: str, context: Optional[Dict] = None,
+                deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Executa a tarefa
+        
+        deadline: prazo definido por quem chama. O agent limita suas chamadas
+        ao tempo restante e, se o prazo esgotar (ou for cancelado), desiste e
+        retorna success=False com timed_out=True.
         Retorna: Dict com output, tokens, cost, etc
         """
         pass
     
+    def _failure(self, error: Exception, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """Resultado de falha (timed_out indica prazo esgotado)"""
+        return {
+            'success': False,
+            'error': str(error),
+            'provider': self.name,
+            'timed_out': isinstance(error, DeadlineExceededError) or
+                         (deadline is not None and deadline.expired())
+        }
+    
     def get_capability(self, name: str) -> Optional[AgentCapability]:
         """Busca capacidade por nome"""
-        for cap in self.capabilities:
-            if cap.name == name:
-                return cap
-        return None
+        return self._capabilities_by_name.get(name)
+    
+    def min_complexity(self, task_type: str) -> float:
+        """
+        Complexidade mínima a partir da qual o agent aceita o tipo de tarefa
+        (usada no índice de capacidades; 0 deixa a decisão para can_handle)
+        """
+        return 0.0
 
 
 class ClaudeAgent(BaseAgent):
     """Agent que usa API do Claude"""
     
+    # Mapear tipos de tarefa para capacidades
+    TASK_CAPABILITY_MAP = {
+        'reasoning_advanced': 'reasoning',
+        'code_complex': 'code_generation',
+        'code_simple': 'code_generation',
+        'analysis_deep': 'document_analysis',
+    }
+    TASK_TYPES = tuple(TASK_CAPABILITY_MAP)
+    
+    @staticmethod
+    def agent_name(model: str) -> str:
+        return f"Claude-{model}"
+    
     def __init__(self, model: str = "claude-3-5-haiku-20241022"):
         capabilities = [
             AgentCapability(
@@ -81,12 +137,13 @@ class ClaudeAgent(BaseAgent):
                 cost_multiplier=1.5
             ),
         ]
-        super().__init__(f"Claude-{model}", capabilities)
+        super().__init__(self.agent_name(model), capabilities)
         
         self.model = model
         self.api_key = os.getenv('ANTHROPIC_API_KEY')
         if self.api_key:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            # Cliente compartilhado do processo (o SDK só é carregado aqui)
+            self.client = get_client_pool().anthropic(self.api_key)
         else:
             self.client = None
             self.logger.warning("⚠️ ANTHROPIC_API_KEY não configurada")
@@ -94,15 +151,7 @@ class ClaudeAgent(BaseAgent):
     def can_handle(self, task_type: str, complexity: float) -> Tuple[bool, float]:
         """Verifica se pode lidar com a tarefa"""
         
-        # Mapear tipos de tarefa para capacidades
-        task_capability_map = {
-            'reasoning_advanced': 'reasoning',
-            'code_complex': 'code_generation',
-            'code_simple': 'code_generation',
-            'analysis_deep': 'document_analysis',
-        }
-        
-        capability_name = task_capability_map.get(task_type)
+        capability_name = self.TASK_CAPABILITY_MAP.get(task_type)
         if not capability_name:
             return False, 0.0
         
@@ -117,8 +166,14 @@ class ClaudeAgent(BaseAgent):
         
         return False, 0.0
     
-    def execute(self, input_text: str, context: Optional[Dict] = None) -> Dict[str, Any]:
-        """Executa tarefa com Claude"""
+    def min_complexity(self, task_type: str) -> float:
+        """Limiar de confiança da capacidade que atende o tipo (inf se nenhuma)"""
+        capability = self.get_capability(self.TASK_CAPABILITY_MAP.get(task_type))
+        return capability.confidence_threshold if capability else float('inf')
+    
+    def execute(self, input_text: str, context: Optional[Dict] = None,
+                deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Executa tarefa com Claude (timeout da requisição = tempo restante do deadline)"""
         if not self.client:
             raise ValueError("Claude API não configurada")
         
@@ -128,48 +183,44 @@ class ClaudeAgent(BaseAgent):
             # Preparar mensagens
             messages = [{"role": "user", "content": input_text}]
             
-            # Adicionar contexto se fornecido
-            if context and context.get('system_prompt'):
-                # Claude não suporta system no messages, usar como primeira mensagem
-                messages.insert(0, {
-                    "role": "user",
-                    "content": context['system_prompt']
-                })
+            # System prompt vai no parâmetro system (com cache_control se longo)
+            system_prompt = context.get('system_prompt') if context else None
             
             # Chamar API
-            response = self.client.messages.create(
+            response = bounded_client(self.client, deadline, self.name).messages.create(
                 model=self.model,
                 max_tokens=4096,
-                messages=messages
+                messages=messages,
+                **prompt_caching.request_kwargs(system_prompt)
             )
             
             output = response.content[0].text
-            input_tokens = response.usage.input_tokens
-            output_tokens = response.usage.output_tokens
+            usage = prompt_caching.extract_usage(response.usage)
             
-            self.logger.info(f"✅ {self.name} respondeu: {input_tokens} in, {output_tokens} out tokens")
+            self.logger.info(
+                f"✅ {self.name} respondeu: {usage['input_tokens']} in, {usage['output_tokens']} out tokens "
+                f"(cache: {usage['cache_read_input_tokens']} lidos, {usage['cache_creation_input_tokens']} gravados)"
+            )
             
             return {
                 'success': True,
                 'output': output,
-                'input_tokens': input_tokens,
-                'output_tokens': output_tokens,
+                **usage,
                 'model': self.model,
                 'provider': self.name
             }
             
         except Exception as e:
             self.logger.error(f"❌ Erro ao executar {self.name}: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'provider': self.name
-            }
+            return self._failure(e, deadline)
 
 
 class ManusLLMAgent(BaseAgent):
     """Agent que usa LLM interno do Manus"""
     
+    # Tarefas simples
+    TASK_TYPES = ('chat', 'general', 'file_search')
+    
     def __init__(self):
         capabilities = [
             AgentCapability(
@@ -193,19 +244,19 @@ class ManusLLMAgent(BaseAgent):
     def can_handle(self, task_type: str, complexity: float) -> Tuple[bool, float]:
         """Verifica se pode lidar com a tarefa"""
         
-        # Tarefas simples
-        simple_tasks = ['chat', 'general', 'file_search']
-        
-        if task_type in simple_tasks and complexity < 70:
+        if task_type in self.TASK_TYPES and complexity < 70:
             confidence = 80.0 - complexity / 2
             return True, confidence
         
         return False, 0.0
     
-    def execute(self, input_text: str, context: Optional[Dict] = None) -> Dict[str, Any]:
+    def execute(self, input_text: str, context: Optional[Dict] = None,
+                deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """Executa tarefa com Manus LLM"""
         try:
             self.logger.info("🤖 Executando com Manus LLM...")
+            if deadline is not None:
+                deadline.check(self.name)
             
             # Chamar API interna do Manus
             # TODO: Implementar chamada real quando API estiver disponível
@@ -223,16 +274,14 @@ class ManusLLMAgent(BaseAgent):
             
         except Exception as e:
             self.logger.error(f"❌ Erro ao executar Manus LLM: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'provider': self.name
-            }
+            return self._failure(e, deadline)
 
 
 class CometVisionAgent(BaseAgent):
     """Agent que usa Comet Vision para análise visual"""
     
+    TASK_TYPES = ('visual_analysis', 'website_clone', 'frontend_validation')
+    
     def __init__(self):
         capabilities = [
             AgentCapability(
@@ -261,18 +310,19 @@ class CometVisionAgent(BaseAgent):
     def can_handle(self, task_type: str, complexity: float) -> Tuple[bool, float]:
         """Verifica se pode lidar com a tarefa"""
         
-        visual_tasks = ['visual_analysis', 'website_clone', 'frontend_validation']
-        
-        if task_type in visual_tasks:
+        if task_type in self.TASK_TYPES:
             confidence = 90.0  # Alta confiança para tarefas visuais
             return True, confidence
         
         return False, 0.0
     
-    def execute(self, input_text: str, context: Optional[Dict] = None) -> Dict[str, Any]:
+    def execute(self, input_text: str, context: Optional[Dict] = None,
+                deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """Executa tarefa com Comet Vision"""
         try:
             self.logger.info("🤖 Executando com Comet Vision...")
+            if deadline is not None:
+                deadline.check(self.name)
             
             # Extrair URL do input se presente
             url = context.get('url') if context else None
@@ -301,19 +351,135 @@ class CometVisionAgent(BaseAgent):
             
         except Exception as e:
             self.logger.error(f"❌ Erro ao executar Comet Vision: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'provider': self.name
-            }
+            return self._failure(e, deadline)
+
+
+@dataclass
+class FanOutBranch:
+    """Ramo de um fan-out: chamada independente com prazo próprio (recebido em func)"""
+    name: str
+    func: Callable[[Deadline], Dict[str, Any]]
+    timeout: Optional[float] = None  # Segundos (None: prazo padrão do executor)
+
+
+@dataclass
+class BranchOutcome:
+    """Desfecho de um ramo: completed, failed ou dropped (passou do prazo)"""
+    name: str
+    status: str
+    elapsed_ms: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class FanOutExecutor:
+    """
+    Executor fan-out/fan-in
+    
+    Dispara os ramos em paralelo e entrega os desfechos na ordem em que
+    terminam, para que o consumidor (ex.: a síntese) processe resultados
+    parciais sem esperar os demais. Cada ramo recebe um Deadline próprio,
+    limitado pelo orçamento de latência do fan-out; ramos atrasados são
+    descartados e têm o Deadline cancelado (os que ainda não começaram nem
+    chegam a chamar o provider, os em execução já têm o timeout da requisição
+    limitado ao prazo do ramo), liberando a thread do pool compartilhado.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, branch_timeout: Optional[float] = None,
+                 latency_budget: Optional[float] = None):
+        """
+        Args:
+            max_workers: Ramos executados simultaneamente
+            branch_timeout: Prazo padrão de cada ramo em segundos
+            latency_budget: Tempo máximo do fan-out inteiro em segundos
+        """
+        self.max_workers = max_workers or int(os.getenv('ORCHESTRATOR_FANOUT_WORKERS', '8'))
+        self.branch_timeout = branch_timeout or float(os.getenv('ORCHESTRATOR_FANOUT_BRANCH_TIMEOUT', '30'))
+        self.latency_budget = latency_budget or float(os.getenv('ORCHESTRATOR_FANOUT_BUDGET', '45'))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='agent-fanout')
+            return self._executor
+    
+    def run(self, branches: List[FanOutBranch],
+            deadline: Optional[Deadline] = None) -> Iterator[BranchOutcome]:
+        """
+        Executa os ramos e gera os desfechos conforme terminam
+        deadline: prazo externo (ex.: da tarefa), limita também o orçamento do fan-out
+        """
+        executor = self._get_executor()
+        started = time.monotonic()
+        budget = Deadline(self.latency_budget, parent=deadline)
+        
+        futures = {}
+        deadlines: Dict[Any, Deadline] = {}
+        for branch in branches:
+            branch_deadline = Deadline(branch.timeout or self.branch_timeout, parent=budget)
+            future = executor.submit(branch.func, branch_deadline)
+            futures[future] = branch
+            deadlines[future] = branch_deadline
+        
+        def elapsed_ms() -> int:
+            return int((time.monotonic() - started) * 1000)
+        
+        pending = set(futures)
+        try:
+            while pending:
+                for future in [f for f in pending if deadlines[f].expired()]:
+                    pending.discard(future)
+                    future.cancel()
+                    deadlines[future].cancel()
+                    logger.warning(f"⏱️ Ramo {futures[future].name} descartado após {elapsed_ms()}ms")
+                    yield BranchOutcome(futures[future].name, 'dropped', elapsed_ms())
+                if not pending:
+                    break
+                
+                timeout = min(deadlines[f].remaining() for f in pending)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future].name
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        yield BranchOutcome(name, 'failed', elapsed_ms(), error=str(e))
+                        continue
+                    if result.get('success', True):
+                        yield BranchOutcome(name, 'completed', elapsed_ms(), result=result)
+                    else:
+                        yield BranchOutcome(name, 'failed', elapsed_ms(), result=result,
+                                            error=result.get('error'))
+        finally:
+            # Consumidor encerrou antes: não iniciar ramos na fila, encerrar os em execução
+            for future in pending:
+                future.cancel()
+                deadlines[future].cancel()
 
 
 class GensparkSimulatedAgent(BaseAgent):
     """
     Agent que simula funcionalidade do Genspark
     Usa Claude + Web Search para replicar capacidades
+    
+    Pesquisa multi-fonte em fan-out: cada ângulo da pesquisa é uma chamada
+    independente (modelo rápido) executada em paralelo, e a síntese (modelo
+    balanceado) recebe os achados conforme chegam, sem esperar ramos atrasados.
     """
     
+    TASK_TYPES = ('research', 'multi_source_search', 'synthesis')
+    
+    # Ângulos padrão da pesquisa (context['sub_queries'] substitui)
+    RESEARCH_ANGLES = (
+        ('visao_geral', "Visão geral: contexto, definições e conceitos centrais"),
+        ('dados_fontes', "Dados, números e fontes primárias ou oficiais relevantes"),
+        ('comparativo', "Comparação entre alternativas, concorrentes ou abordagens"),
+        ('riscos', "Riscos, limitações, críticas e pontos de divergência"),
+    )
+    
     def __init__(self):
         capabilities = [
             AgentCapability(
@@ -331,15 +497,16 @@ class GensparkSimulatedAgent(BaseAgent):
         ]
         super().__init__("GensparkSimulated", capabilities)
         
-        # Usar Claude com web search
+        # Usar Claude com web search: Haiku nos ramos, Sonnet na síntese
         self.claude_agent = ClaudeAgent(model="claude-3-5-sonnet-20241022")
+        self.branch_agent = ClaudeAgent(model="claude-3-5-haiku-20241022")
+        self.fanout = FanOutExecutor()
+        self.max_branches = int(os.getenv('ORCHESTRATOR_RESEARCH_MAX_BRANCHES', '6'))
     
     def can_handle(self, task_type: str, complexity: float) -> Tuple[bool, float]:
         """Verifica se pode lidar com a tarefa"""
         
-        research_tasks = ['research', 'multi_source_search', 'synthesis']
-        
-        if task_type in research_tasks:
+        if task_type in self.TASK_TYPES:
             confidence = 85.0
             return True, confidence
         
@@ -349,16 +516,84 @@ class GensparkSimulatedAgent(BaseAgent):
         
         return False, 0.0
     
-    def execute(self, input_text: str, context: Optional[Dict] = None) -> Dict[str, Any]:
+    def _research_branches(self, input_text: str, context: Optional[Dict],
+                           deadline: Optional[Deadline]) -> List[FanOutBranch]:
+        """
+        Um ramo por ângulo de pesquisa (ou por sub-consulta do contexto)
+        O FanOutExecutor passa a cada ramo seu próprio deadline (filho de
+        deadline): a chamada de um ramo atrasado expira junto com ele em vez de
+        continuar ocupando uma thread.
+        """
+        sub_queries = (context or {}).get('sub_queries')
+        if sub_queries:
+            angles = [(f"consulta_{i + 1}", query) for i, query in enumerate(sub_queries)]
+        else:
+            angles = list(self.RESEARCH_ANGLES)
+        
+        branches = []
+        for name, angle in angles[:self.max_branches]:
+            prompt = f"""Você é um pesquisador. Investigue apenas o seguinte ângulo da solicitação abaixo.
+
+Ângulo: {angle}
+
+Solicitação: {input_text}
+
+Responda de forma concisa, com fatos verificáveis e as fontes quando houver."""
+            branches.append(FanOutBranch(name, functools.partial(
+                self.branch_agent.execute, prompt, context
+            )))
+        return branches
+    
+    @staticmethod
+    def _synthesis_prompt(input_text: str, findings: List[Tuple[str, str]],
+                          missing: List[str]) -> str:
+        """Prompt de síntese com os achados parciais recebidos"""
+        sections = "\n\n".join(f"### {name}\n{output}" for name, output in findings)
+        prompt = f"""Você é um assistente de pesquisa avançado. Sua tarefa é:
+
+1. Analisar a seguinte solicitação de pesquisa
+2. Combinar os achados das pesquisas parciais abaixo
+3. Sintetizar as informações de forma clara e estruturada
+4. Citar as fontes quando relevante
+
+Solicitação: {input_text}
+
+ACHADOS DAS PESQUISAS PARCIAIS:
+
+{sections}"""
+        if missing:
+            prompt += f"\n\nÂngulos sem resposta a tempo (complete com seu conhecimento se necessário): {', '.join(missing)}"
+        return prompt + "\n\nPor favor, forneça uma resposta completa e bem estruturada."
+    
+    def execute(self, input_text: str, context: Optional[Dict] = None,
+                deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Executa tarefa simulando Genspark
-        Usa Claude com prompt especial para pesquisa multi-fonte
+        Fan-out dos ângulos de pesquisa e síntese com Claude, ambos dentro do deadline
+        context['on_partial'](nome, saída) recebe cada achado assim que chega
         """
         try:
             self.logger.info("🤖 Executando com Genspark Simulated (Claude + Web Search)...")
+            started = time.monotonic()
+            on_partial = (context or {}).get('on_partial')
+            
+            # Fan-out: os achados entram na síntese na ordem em que chegam
+            findings: List[Tuple[str, str]] = []
+            outcomes: List[BranchOutcome] = []
+            for outcome in self.fanout.run(self._research_branches(input_text, context, deadline), deadline):
+                outcomes.append(outcome)
+                if outcome.status == 'completed':
+                    findings.append((outcome.name, outcome.result['output']))
+                    if on_partial:
+                        on_partial(outcome.name, outcome.result['output'])
+            fanout_ms = int((time.monotonic() - started) * 1000)
+            missing = [outcome.name for outcome in outcomes if outcome.status != 'completed']
             
-            # Criar prompt especial para pesquisa
-            enhanced_prompt = f"""Você é um assistente de pesquisa avançado. Sua tarefa é:
+            if findings:
+                prompt = self._synthesis_prompt(input_text, findings, missing)
+            else:
+                # Nenhum ramo respondeu: pesquisa em uma única chamada
+                prompt = f"""Você é um assistente de pesquisa avançado. Sua tarefa é:
 
 1. Analisar a seguinte solicitação de pesquisa
 2. Identificar as principais fontes de informação necessárias
@@ -369,89 +604,230 @@ Solicitação: {input_text}
 
 Por favor, forneça uma resposta completa e bem estruturada."""
             
-            # Usar Claude agent
-            result = self.claude_agent.execute(enhanced_prompt, context)
+            # Fan-in: síntese com Claude
+            result = self.claude_agent.execute(prompt, context, deadline)
             
+            # Tokens dos ramos e o resumo do fan-out valem também se a síntese falhou
+            branch_results = [outcome.result for outcome in outcomes if outcome.result]
+            for field in prompt_caching.USAGE_FIELDS:
+                result[field] = result.get(field, 0) + sum(r.get(field, 0) for r in branch_results)
+            result['provider'] = self.name
+            result['fanout'] = {
+                'branches': len(outcomes),
+                'completed': len(findings),
+                'failed': [o.name for o in outcomes if o.status == 'failed'],
+                'dropped': [o.name for o in outcomes if o.status == 'dropped'],
+                'fanout_ms': fanout_ms
+            }
             if result['success']:
-                result['provider'] = self.name
                 result['note'] = "Funcionalidade Genspark simulada com Claude + Web Search"
             
             return result
             
         except Exception as e:
             self.logger.error(f"❌ Erro ao executar Genspark Simulated: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'provider': self.name
-            }
+            return self._failure(e, deadline)
 
 
 class AgentRegistry:
-    """Registro de agents disponíveis"""
+    """
+    Registro de agents disponíveis
+
+    Os agents padrão são registrados como AgentSpec e construídos no primeiro
+    uso (get_agent, seleção ou listagem), de modo que criar o registry não
+    carrega o SDK da Anthropic nem instancia clientes.
+
+    A seleção usa um índice de capacidades (task_type → candidatos ordenados
+    pela complexidade mínima) e uma tabela de roteamento memoizada por
+    (task_type, faixa de complexidade); ambos são descartados a cada registro.
+    """
     
-    def __init__(self):
+    def __init__(self, complexity_bucket: float = 1.0):
+        """
+        Args:
+            complexity_bucket: Largura da faixa de complexidade da tabela de
+                roteamento (dentro da faixa o agent escolhido é reaproveitado)
+        """
         self.agents: Dict[str, BaseAgent] = {}
+        self.specs: Dict[str, AgentSpec] = {}
+        self.complexity_bucket = complexity_bucket
+        self._lock = threading.Lock()
+        # task_type → (complexidades mínimas ordenadas, [(ordem de registro, agent)])
+        self._capability_index: Dict[str, Tuple[List[float], List[Tuple[int, BaseAgent]]]] = {}
+        # (task_type, faixa) → agent escolhido (None: nenhum atende)
+        self._routing_table: Dict[Tuple[str, int], Optional[BaseAgent]] = {}
+        self._generation = 0
+        self._routing_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
         self.logger = logging.getLogger("AgentRegistry")
         self._register_default_agents()
     
     def _register_default_agents(self):
-        """Registra agents padrão"""
-        try:
-            # Claude Haiku (rápido e barato)
-            self.register(ClaudeAgent(model="claude-3-5-haiku-20241022"))
-            
-            # Claude Sonnet (balanceado)
-            self.register(ClaudeAgent(model="claude-3-5-sonnet-20241022"))
-            
-            # Claude Opus (máxima capacidade)
-            self.register(ClaudeAgent(model="claude-opus-4-20250514"))
-            
-            # Manus LLM (built-in)
-            self.register(ManusLLMAgent())
-            
-            # Comet Vision
-            self.register(CometVisionAgent())
-            
-            # Genspark Simulated
-            self.register(GensparkSimulatedAgent())
-            
-            self.logger.info(f"✅ {len(self.agents)} agents registrados")
-            
-        except Exception as e:
-            self.logger.error(f"❌ Erro ao registrar agents: {e}")
+        """Registra agents padrão (sem construí-los)"""
+        # Claude Haiku (rápido e barato), Sonnet (balanceado) e Opus (máxima capacidade)
+        for model in ("claude-3-5-haiku-20241022", "claude-3-5-sonnet-20241022", "claude-opus-4-20250514"):
+            self.register_lazy(
+                ClaudeAgent.agent_name(model), functools.partial(ClaudeAgent, model=model),
+                ClaudeAgent.TASK_TYPES
+            )
+        
+        # Manus LLM (built-in)
+        self.register_lazy("ManusLLM", ManusLLMAgent, ManusLLMAgent.TASK_TYPES)
+        
+        # Comet Vision
+        self.register_lazy("CometVision", CometVisionAgent, CometVisionAgent.TASK_TYPES)
+        
+        # Genspark Simulated
+        self.register_lazy("GensparkSimulated", GensparkSimulatedAgent, GensparkSimulatedAgent.TASK_TYPES)
+        
+        self.logger.info(f"✅ {len(self.specs)} agents registrados")
     
     def register(self, agent: BaseAgent):
-        """Registra um agent"""
-        self.agents[agent.name] = agent
+        """Registra um agent já construído"""
+        with self._lock:
+            self.specs[agent.name] = AgentSpec(agent.name, lambda: agent, agent.TASK_TYPES)
+            self.agents[agent.name] = agent
+            self._invalidate_routing()
         self.logger.debug(f"Agent registrado: {agent.name}")
     
+    def register_lazy(self, name: str, factory: Callable[[], BaseAgent],
+                      task_types: Tuple[str, ...] = ()):
+        """Registra um agent a ser construído por factory no primeiro uso"""
+        with self._lock:
+            self.specs[name] = AgentSpec(name, factory, tuple(task_types))
+            self.agents.pop(name, None)
+            self._invalidate_routing()
+        self.logger.debug(f"Agent registrado (sob demanda): {name}")
+    
+    def _materialize(self, name: str) -> Optional[BaseAgent]:
+        """Constrói o agent registrado sob demanda (uma única vez)"""
+        agent = self.agents.get(name)
+        if agent is not None:
+            return agent
+        
+        with self._lock:
+            agent = self.agents.get(name)
+            if agent is not None:
+                return agent
+            spec = self.specs.get(name)
+            if spec is None:
+                return None
+            try:
+                agent = spec.factory()
+            except Exception as e:
+                # Como no registro antecipado: agent que não constrói fica indisponível
+                self.logger.error(f"❌ Erro ao construir agent {name}: {e}")
+                del self.specs[name]
+                self._invalidate_routing()
+                return None
+            self.agents[name] = agent
+        
+        self.logger.debug(f"Agent construído: {name}")
+        return agent
+    
     def get_agent(self, name: str) -> Optional[BaseAgent]:
         """Busca agent por nome"""
-        return self.agents.get(name)
+        return self._materialize(name)
+    
+    def _invalidate_routing(self):
+        """Descarta índice e tabela de roteamento (chamado com o lock adquirido)"""
+        self._capability_index.clear()
+        self._routing_table.clear()
+        self._generation += 1
+        self._routing_stats['invalidations'] += 1
+    
+    def _candidates(self, task_type: str) -> Tuple[List[float], List[Tuple[int, BaseAgent]]]:
+        """
+        Entrada do índice de capacidades para o task_type (construída na
+        primeira consulta; só constrói os agents cujo spec aceita o tipo)
+        """
+        entry = self._capability_index.get(task_type)
+        if entry is not None:
+            return entry
+        
+        generation = self._generation
+        ranked = []
+        for order, spec in enumerate(list(self.specs.values())):
+            if spec.task_types and task_type not in spec.task_types:
+                continue
+            agent = self._materialize(spec.name)
+            if agent is None:
+                continue
+            threshold = agent.min_complexity(task_type)
+            if threshold != float('inf'):
+                ranked.append((threshold, order, agent))
+        ranked.sort(key=lambda item: (item[0], item[1]))
+        entry = ([threshold for threshold, _, _ in ranked], [(order, agent) for _, order, agent in ranked])
+        
+        with self._lock:
+            # Um registro durante a construção torna a entrada obsoleta
+            if generation == self._generation:
+                self._capability_index[task_type] = entry
+        return entry
+    
+    def _select(self, task_type: str, complexity: float) -> Optional[Tuple[BaseAgent, float]]:
+        """Avalia os candidatos com complexidade mínima <= complexity"""
+        thresholds, candidates = self._candidates(task_type)
+        best = None
+        best_key = (0.0, 0)
+        for order, agent in candidates[:bisect.bisect_right(thresholds, complexity)]:
+            can_handle, confidence = agent.can_handle(task_type, complexity)
+            # Empate: vence o registrado primeiro
+            if can_handle and (confidence, -order) > best_key:
+                best = (agent, confidence)
+                best_key = (confidence, -order)
+        return best
     
     def find_best_agent(self, task_type: str, complexity: float) -> Optional[Tuple[BaseAgent, float]]:
         """
         Encontra o melhor agent para a tarefa
+        Consulta a tabela de roteamento; em caso de falta, avalia apenas os
+        candidatos do índice de capacidades
         Retorna: (agent, confiança) ou None
         """
-        best_agent = None
-        best_confidence = 0.0
+        key = (task_type, int(complexity // self.complexity_bucket))
+        generation = self._generation
+        best = None
         
-        for agent in self.agents.values():
+        if key in self._routing_table:
+            agent = self._routing_table[key]
+            if agent is None:
+                self._count('hits')
+                return None
+            # Confiança recalculada para a complexidade exata
             can_handle, confidence = agent.can_handle(task_type, complexity)
-            if can_handle and confidence > best_confidence:
-                best_agent = agent
-                best_confidence = confidence
+            if can_handle:
+                self._count('hits')
+                best = (agent, confidence)
         
-        if best_agent:
-            self.logger.info(f"🎯 Melhor agent: {best_agent.name} (confiança: {best_confidence:.1f}%)")
-            return best_agent, best_confidence
+        if best is None:
+            self._count('misses')
+            best = self._select(task_type, complexity)
+            with self._lock:
+                if generation == self._generation:
+                    self._routing_table[key] = best[0] if best else None
+        
+        if best:
+            self.logger.info(f"🎯 Melhor agent: {best[0].name} (confiança: {best[1]:.1f}%)")
+            return best
         
         return None
     
+    def _count(self, name: str):
+        with self._lock:
+            self._routing_stats[name] += 1
+    
+    def routing_stats(self) -> Dict[str, Any]:
+        """Acertos e faltas da tabela de roteamento e tamanho do índice"""
+        with self._lock:
+            stats = dict(self._routing_stats)
+            stats['indexed_task_types'] = len(self._capability_index)
+            stats['routing_entries'] = len(self._routing_table)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+    
     def list_agents(self) -> List[Dict[str, Any]]:
-        """Lista todos os agents disponíveis"""
+        """Lista todos os agents disponíveis (constrói os ainda não usados)"""
         return [
             {
                 'name': agent.name,
@@ -465,7 +841,8 @@ class AgentRegistry:
                     for cap in agent.capabilities
                 ]
             }
-            for agent in self.agents.values()
+            for agent in map(self._materialize, list(self.specs))
+            if agent is not None
         ]
 
 
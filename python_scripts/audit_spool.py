@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Spool Local de Eventos de Auditoria
+Enquanto o MySQL está indisponível, os eventos de auditoria são acrescentados
+a segmentos locais (JSON lines) e recarregados em ai_audit_logs quando o banco
+volta; o event_id de cada evento torna a recarga idempotente
+Vários processos podem compartilhar o diretório: cada um escreve em segmentos
+próprios e só segmentos liberados pelo dono são recarregados
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock, segmentos de processos que caíram não são recuperados
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = 'audit-'
+SEGMENT_SUFFIX = '.jsonl'      # Segmento ativo (em escrita pelo dono)
+SEALED_SUFFIX = '.sealed'      # Segmento liberado para a recarga
+
+
+class AuditSpool:
+    """
+    Spool append-only em segmentos
+
+    O segmento ativo recebe os eventos; ao passar de segment_max_bytes (ou
+    em seal()) ele é fechado e um novo é aberto. Segmentos fechados são
+    lidos pela recarga e apagados após a gravação no banco. O fsync é feito
+    em lote: a cada fsync_every eventos ou fsync_interval_ms desde o último.
+    
+    Os nomes levam o dono (pid + sufixo aleatório) e a sequência do dono:
+    audit-<pid>-<id>-<seq>.jsonl. O dono mantém lock exclusivo (flock) no
+    segmento ativo e, ao fechá-lo, o renomeia para .sealed; a recarga só lê
+    segmentos .sealed. Segmentos ativos sem lock (dono caiu) são renomeados
+    para .sealed por quem recarrega.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = 8 * 1024 * 1024,
+                 fsync_every: int = 500, fsync_interval_ms: int = 1000):
+        """
+        Args:
+            directory: Diretório dos segmentos (criado se não existir)
+            segment_max_bytes: Tamanho a partir do qual o segmento ativo é fechado
+            fsync_every: Eventos acumulados sem fsync que forçam um fsync
+            fsync_interval_ms: Tempo máximo de eventos sem fsync (verificado a cada
+                               append e em sync_if_due)
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval_ms / 1000
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = None
+        self._active_path: Optional[str] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._next_seq = 1
+        self._stats = {'spooled': 0, 'fsyncs': 0, 'segments_sealed': 0, 'segments_claimed': 0}
+        existing = self._segment_paths()
+        if existing:
+            logger.warning(f"⚠️ Spool de auditoria com {len(existing)} segmentos pendentes em {directory}")
+
+    def _segment_paths(self, suffixes=(SEGMENT_SUFFIX, SEALED_SUFFIX)) -> List[str]:
+        """Segmentos do diretório (de todos os donos), do mais antigo ao mais novo"""
+        paths = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(suffixes)
+        ]
+
+        def age(path: str):
+            try:
+                return os.path.getmtime(path), path
+            except FileNotFoundError:
+                return float('inf'), path
+        return sorted(paths, key=age)
+
+    @staticmethod
+    def _sealed_path(path: str) -> str:
+        return path[:-len(SEGMENT_SUFFIX)] + SEALED_SUFFIX
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Tipo não serializável no spool: {type(value).__name__}")
+
+    def append(self, rows: List[tuple]):
+        """Acrescenta eventos (tuplas na ordem das colunas do INSERT) ao segmento ativo"""
+        data = ''.join(
+            json.dumps(row, ensure_ascii=False, default=self._encode) + '\n' for row in rows
+        )
+        with self._lock:
+            if self._file is None:
+                self._active_path = os.path.join(
+                    self.directory,
+                    f"{SEGMENT_PREFIX}{self._owner}-{self._next_seq:012d}{SEGMENT_SUFFIX}"
+                )
+                self._next_seq += 1
+                self._file = open(self._active_path, 'a', encoding='utf-8')
+                if fcntl is not None:
+                    # Segmento vazio nunca é reivindicado: o lock vem antes da primeira escrita
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            self._file.write(data)
+            self._file.flush()
+            self._unsynced += len(rows)
+            self._stats['spooled'] += len(rows)
+            if self._unsynced >= self.fsync_every or self._sync_overdue():
+                self._sync()
+            if self._file.tell() >= self.segment_max_bytes:
+                self._seal()
+
+    def sync_if_due(self):
+        """fsync dos eventos pendentes se o intervalo máximo já passou"""
+        with self._lock:
+            if self._unsynced and self._sync_overdue():
+                self._sync()
+
+    def _sync_overdue(self) -> bool:
+        return time.monotonic() - self._last_sync >= self.fsync_interval
+
+    def _sync(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._stats['fsyncs'] += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def seal(self):
+        """Fecha o segmento ativo para que seja recarregado"""
+        with self._lock:
+            self._seal()
+
+    def _seal(self):
+        if self._file is None:
+            return
+        self._sync()
+        # Renomeado ainda com o lock: ninguém reivindica um segmento em escrita
+        os.rename(self._active_path, self._sealed_path(self._active_path))
+        self._file.close()
+        self._file = None
+        self._active_path = None
+        self._stats['segments_sealed'] += 1
+
+    def has_pending(self) -> bool:
+        """Há eventos no spool (segmentos fechados ou ativo)?"""
+        with self._lock:
+            return self._file is not None or bool(self._segment_paths())
+
+    def sealed_segments(self) -> List[str]:
+        """
+        Segmentos fechados, do mais antigo ao mais novo
+        Antes, segmentos ativos de processos que caíram são liberados (.sealed).
+        """
+        self._claim_orphans()
+        return self._segment_paths((SEALED_SUFFIX,))
+
+    def _claim_orphans(self):
+        """Libera segmentos ativos cujo dono não mantém mais o lock"""
+        if fcntl is None:
+            return
+        with self._lock:
+            active_path = self._active_path
+        for path in self._segment_paths((SEGMENT_SUFFIX,)):
+            if path == active_path:
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # Fechado pelo dono ou liberado por outro processo
+            try:
+                if os.fstat(fd).st_size == 0:
+                    # Dono pode estar entre a criação e o lock
+                    continue
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # Dono vivo
+                try:
+                    os.rename(path, self._sealed_path(path))
+                except FileNotFoundError:
+                    continue
+            finally:
+                os.close(fd)
+            with self._lock:
+                self._stats['segments_claimed'] += 1
+            logger.warning(f"⚠️ Segmento de processo encerrado liberado para recarga: "
+                           f"{os.path.basename(path)}")
+
+    def read_segment(self, path: str) -> Iterator[tuple]:
+        """Eventos de um segmento fechado (linhas truncadas por queda são ignoradas)"""
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    logger.warning(f"⚠️ Registro inválido no spool ({os.path.basename(path)}, "
+                                   f"linha {number}), ignorando")
+                    continue
+                # Coluna timestamp (segunda) volta a ser datetime
+                row[1] = datetime.fromisoformat(row[1])
+                yield tuple(row)
+
+    def remove_segment(self, path: str):
+        """Apaga um segmento já recarregado no banco (ou por outro processo)"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Eventos e fsyncs do processo, segmentos e bytes pendentes no disco"""
+        with self._lock:
+            paths = self._segment_paths()
+            stats = dict(self._stats)
+        sizes = []
+        for path in paths:
+            try:
+                sizes.append(os.path.getsize(path))
+            except FileNotFoundError:
+                pass  # Recarregado por outro processo
+        stats['pending_segments'] = len(sizes)
+        stats['pending_bytes'] = sum(sizes)
+        return stats
+
+    def close(self):
+        """fsync e fechamento do segmento ativo"""
+        self.seal()
+
+
+def chunks(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    """Agrupa os eventos de um segmento em lotes para a recarga"""
+    batch: List[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
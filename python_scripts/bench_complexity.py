@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark do ComplexityAnalyzer
+Compara a varredura antiga (any(word in text) por categoria) com o autômato
+Aho–Corasick e com analyze_batch, reportando o custo por entrada por tamanho de texto
+
+Uso:
+    python bench_complexity.py [--iterations N] [--batch-size N]
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import Callable, List
+
+from orchestrator import ComplexityAnalyzer, ahocorasick
+
+# Tamanhos de texto avaliados (caracteres)
+TEXT_LENGTHS = (50, 200, 1000, 5000, 20000)
+
+FILLER_WORDS = (
+    'para', 'dados', 'relatório', 'sistema', 'usuário', 'cliente', 'processo',
+    'tabela', 'valor', 'mensal', 'entrada', 'saída', 'servidor', 'banco'
+)
+
+
+def legacy_analyze(input_text: str):
+    """Implementação anterior: uma varredura do texto por categoria"""
+    text_lower = input_text.lower()
+    task_type, complexity = ComplexityAnalyzer.DEFAULT_TASK
+    for keyword_type, keyword_complexity, keywords in ComplexityAnalyzer.TASK_KEYWORDS:
+        if any(word in text_lower for word in keywords):
+            task_type, complexity = keyword_type, keyword_complexity
+            break
+    if len(input_text) > 1000:
+        complexity += 10
+    return max(0, min(100, complexity)), task_type
+
+
+def make_text(length: int, rng: random.Random, keyword: str = None) -> str:
+    """Gera texto de tamanho aproximado com uma palavra-chave no final (pior caso da varredura)"""
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(FILLER_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    if keyword:
+        words.append(keyword)
+    return ' '.join(words)
+
+
+def time_per_input(func: Callable[[str], object], texts: List[str], iterations: int) -> float:
+    """Tempo médio por entrada em microssegundos"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(texts)) * 1e6
+
+
+def time_batch_per_input(texts: List[str], iterations: int) -> float:
+    """Tempo médio por entrada usando analyze_batch"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        ComplexityAnalyzer.analyze_batch(texts)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(texts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark do ComplexityAnalyzer")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    # O log por análise dominaria a medição
+    logging.disable(logging.INFO)
+    rng = random.Random(42)
+
+    if ahocorasick is None:
+        print("⚠️ pyahocorasick não instalado: analyze usa a varredura por categoria")
+        print("   Instale com: pip install pyahocorasick\n")
+
+    print(f"{'chars':>8} | {'legado (µs)':>12} | {'analyze (µs)':>12} | {'lote (µs)':>10} | {'ganho':>6}")
+    print("-" * 64)
+
+    for length in TEXT_LENGTHS:
+        # Palavra-chave de baixa prioridade: a varredura antiga percorre todas as categorias
+        texts = [make_text(length, rng, keyword='explique') for _ in range(args.batch_size)]
+        iterations = max(1, args.iterations * 1000 // max(length, 1000))
+
+        legacy = time_per_input(legacy_analyze, texts, iterations)
+        compiled = time_per_input(ComplexityAnalyzer.analyze, texts, iterations)
+        batch = time_batch_per_input(texts, iterations)
+
+        print(f"{length:>8} | {legacy:>12.2f} | {compiled:>12.2f} | {batch:>10.2f} | {legacy / compiled:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
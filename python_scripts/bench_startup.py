@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização da Orquestração Multi-IA
+Mede, em processos novos (cold start, como uma chamada de CLI ou cron), o
+tempo de importação dos módulos e de construção dos objetos do orquestrador,
+e lista os imports mais caros segundo python -X importtime.
+
+Uso:
+    python bench_startup.py [--runs N] [--top N] [--max-import-ms MS] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cenários: (nome, código executado após o relógio iniciar)
+SCENARIOS = (
+    ('python (referência)', 'pass'),
+    ('import orchestrator', 'import orchestrator'),
+    ('import task_queue', 'import task_queue'),
+    ('AgentRegistry()', 'from agents import AgentRegistry; AgentRegistry()'),
+    ('AgentRegistry + find_best_agent', (
+        'from agents import AgentRegistry; AgentRegistry().find_best_agent("chat", 30.0)'
+    )),
+    ('AuditLogger() (banco inacessível)', (
+        'from audit_logger import AuditLogger; AuditLogger("mysql://u:p@127.0.0.1:9/x")'
+    )),
+    ('AIOrchestrator (banco em memória)', (
+        'import bench_orchestrator as b; '
+        'b.AIOrchestrator(b.BENCH_DATABASE_URL, db=b.InMemoryDatabase(), '
+        'audit_logger=b.InMemoryAuditLogger(), claude_client=b.ClaudeClient(api_key="offline"))'
+    )),
+)
+
+# O relógio começa antes do primeiro import do cenário e para ao final dele
+TIMER = (
+    "import time as _t, logging as _l; _l.disable(_l.CRITICAL); _s = _t.perf_counter()\n"
+    "{code}\n"
+    "print((_t.perf_counter() - _s) * 1000)"
+)
+
+
+def run_scenario(code: str, runs: int) -> List[float]:
+    """Executa o cenário em `runs` processos novos e devolve os tempos em ms"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', TIMER.format(code=code)],
+            cwd=SCRIPT_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return samples
+
+
+def top_imports(module: str, top: int) -> List[Tuple[str, float]]:
+    """Imports diretos do módulo com maior tempo cumulativo (ms) segundo -X importtime"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SCRIPT_DIR, capture_output=True, text=True, check=True
+    ).stderr
+    direct = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.rstrip()[1:]
+        # Cada nível de indentação (2 espaços) é um import aninhado; o nível 1
+        # são os imports diretos do módulo (o cumulativo já inclui os filhos)
+        if len(name) - len(name.lstrip()) == 2:
+            direct.append((name.strip(), int(cumulative) / 1000))
+    return sorted(direct, key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do orquestrador")
+    parser.add_argument('--runs', type=int, default=5, help="Processos por cenário")
+    parser.add_argument('--top', type=int, default=10, help="Imports mais caros listados")
+    parser.add_argument('--max-import-ms', type=float, default=None,
+                        help="Falha (código 1) se a mediana de 'import orchestrator' passar deste valor")
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    report: Dict[str, object] = {'runs': args.runs, 'scenarios': {}}
+    for name, code in SCENARIOS:
+        samples = run_scenario(code, args.runs)
+        report['scenarios'][name] = {
+            'median_ms': round(statistics.median(samples), 1),
+            'min_ms': round(min(samples), 1),
+            'max_ms': round(max(samples), 1)
+        }
+    report['top_imports'] = [
+        {'module': name, 'cumulative_ms': round(ms, 1)}
+        for name, ms in top_imports('orchestrator', args.top)
+    ]
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"🚀 Inicialização a frio ({args.runs} processos por cenário)")
+        for name, stats in report['scenarios'].items():
+            print(f"  {name:<38} mediana {stats['median_ms']:>8.1f}ms | "
+                  f"mín {stats['min_ms']:.1f}ms | máx {stats['max_ms']:.1f}ms")
+        print(f"\n📦 Imports diretos mais caros de orchestrator (cumulativo):")
+        for entry in report['top_imports']:
+            print(f"  {entry['module']:<38} {entry['cumulative_ms']:>8.1f}ms")
+
+    import_ms = report['scenarios']['import orchestrator']['median_ms']
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"❌ import orchestrator acima do limite ({args.max_import_ms}ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
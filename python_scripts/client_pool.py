@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Pool de Clientes HTTP/Anthropic compartilhado pelo processo
+Um cliente httpx por host (keep-alive, limite de conexões por host e timeouts
+configuráveis) usado por todos os clientes Anthropic, e uma sessão requests
+com o mesmo limite para chamadas HTTP diretas. Mede a taxa de reuso de
+conexões e o tempo de handshake (TCP + TLS) de cada conexão nova.
+"""
+
+import os
+import time
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from orchestrator_metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+ANTHROPIC_BASE_URL = os.getenv('ANTHROPIC_BASE_URL', 'https://api.anthropic.com')
+
+
+class _HostStats:
+    """Requisições, conexões novas e handshakes de um host"""
+
+    __slots__ = ('requests', 'new_connections', 'handshake_s_sum', 'handshake_s_max')
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.handshake_s_sum = 0.0
+        self.handshake_s_max = 0.0
+
+
+class _ConnectionTrace:
+    """
+    Extensão 'trace' do httpcore de uma requisição: detecta se a conexão foi
+    aberta para ela e mede o handshake (connect_tcp até o fim do start_tls)
+    """
+
+    __slots__ = ('started', 'handshake_s')
+
+    def __init__(self):
+        self.started: Optional[float] = None
+        self.handshake_s: Optional[float] = None
+
+    def __call__(self, event_name: str, info: Dict[str, Any]):
+        if event_name == 'connection.connect_tcp.started':
+            self.started = time.perf_counter()
+        elif event_name in ('connection.connect_tcp.complete', 'connection.start_tls.complete') \
+                and self.started is not None:
+            self.handshake_s = time.perf_counter() - self.started
+
+
+class _AsyncConnectionTrace(_ConnectionTrace):
+    """Versão para httpx.AsyncClient (o httpcore assíncrono aguarda o trace)"""
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]):
+        _ConnectionTrace.__call__(self, event_name, info)
+
+
+class ClientPool:
+    """
+    Clientes HTTP de longa duração compartilhados
+
+    Clientes Anthropic (síncronos e, por event loop, assíncronos) são
+    criados uma vez por API key sobre o cliente httpx do host da API, de modo
+    que ClaudeClient, ClaudeAgent e DeepSiteClient reaproveitam as mesmas
+    conexões TLS.
+    """
+
+    def __init__(self, max_connections_per_host: int = 20, keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 5.0, read_timeout: float = 600.0,
+                 write_timeout: float = 30.0, pool_timeout: float = 10.0):
+        """
+        Args:
+            max_connections_per_host: Conexões simultâneas por host (mantidas em keep-alive)
+            keepalive_expiry: Segundos que uma conexão ociosa fica aberta
+            connect_timeout, read_timeout, write_timeout: Timeouts em segundos
+            pool_timeout: Espera máxima por uma conexão livre do pool
+        """
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.write_timeout = write_timeout
+        self.pool_timeout = pool_timeout
+
+        self._lock = threading.Lock()
+        self._http_clients: Dict[str, Any] = {}
+        self._async_http_clients: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self._anthropic: Dict[str, Any] = {}
+        self._async_anthropic: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self._session = None
+        self._stats: Dict[str, _HostStats] = {}
+        self.metrics = get_metrics()
+
+    # -- httpx ----------------------------------------------------------
+
+    def _timeout(self):
+        import httpx
+        return httpx.Timeout(connect=self.connect_timeout, read=self.read_timeout,
+                             write=self.write_timeout, pool=self.pool_timeout)
+
+    def _limits(self):
+        import httpx
+        return httpx.Limits(max_connections=self.max_connections_per_host,
+                            max_keepalive_connections=self.max_connections_per_host,
+                            keepalive_expiry=self.keepalive_expiry)
+
+    def http_client(self, base_url: str = ANTHROPIC_BASE_URL):
+        """httpx.Client do host de base_url (um pool de conexões por host)"""
+        host = urlsplit(base_url).netloc
+        client = self._http_clients.get(host)
+        if client is not None:
+            return client
+
+        import httpx
+        with self._lock:
+            client = self._http_clients.get(host)
+            if client is None:
+                def on_request(request):
+                    request.extensions['trace'] = _ConnectionTrace()
+
+                def on_response(response):
+                    self._record(host, response.request.extensions.get('trace'))
+
+                client = httpx.Client(
+                    limits=self._limits(), timeout=self._timeout(),
+                    event_hooks={'request': [on_request], 'response': [on_response]}
+                )
+                self._http_clients[host] = client
+                logger.info(f"🔌 Pool HTTP para {host} (até {self.max_connections_per_host} conexões)")
+        return client
+
+    def async_http_client(self, base_url: str = ANTHROPIC_BASE_URL):
+        """
+        httpx.AsyncClient do host de base_url no event loop atual
+        (conexões assíncronas não podem ser compartilhadas entre loops)
+        """
+        import asyncio
+        import httpx
+        host = urlsplit(base_url).netloc
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            clients = self._async_http_clients.setdefault(loop, {})
+            client = clients.get(host)
+            if client is None:
+                async def on_request(request):
+                    request.extensions['trace'] = _AsyncConnectionTrace()
+
+                async def on_response(response):
+                    self._record(host, response.request.extensions.get('trace'))
+
+                client = httpx.AsyncClient(
+                    limits=self._limits(), timeout=self._timeout(),
+                    event_hooks={'request': [on_request], 'response': [on_response]}
+                )
+                clients[host] = client
+        return client
+
+    # -- Anthropic ------------------------------------------------------
+
+    def anthropic(self, api_key: Optional[str] = None):
+        """Cliente Anthropic compartilhado (um por API key)"""
+        api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
+        client = self._anthropic.get(api_key)
+        if client is not None:
+            return client
+
+        import anthropic
+        http_client = self.http_client(ANTHROPIC_BASE_URL)
+        with self._lock:
+            client = self._anthropic.get(api_key)
+            if client is None:
+                client = anthropic.Anthropic(
+                    api_key=api_key, base_url=ANTHROPIC_BASE_URL,
+                    http_client=http_client, timeout=self._timeout()
+                )
+                self._anthropic[api_key] = client
+        return client
+
+    def async_anthropic(self, api_key: Optional[str] = None):
+        """Cliente AsyncAnthropic compartilhado no event loop atual (um por API key)"""
+        import asyncio
+        import anthropic
+        api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
+        loop = asyncio.get_running_loop()
+        http_client = self.async_http_client(ANTHROPIC_BASE_URL)
+
+        with self._lock:
+            clients = self._async_anthropic.setdefault(loop, {})
+            client = clients.get(api_key)
+            if client is None:
+                client = anthropic.AsyncAnthropic(
+                    api_key=api_key, base_url=ANTHROPIC_BASE_URL,
+                    http_client=http_client, timeout=self._timeout()
+                )
+                clients[api_key] = client
+        return client
+
+    # -- requests -------------------------------------------------------
+
+    def session(self):
+        """requests.Session compartilhada (keep-alive, limite por host e timeout padrão)"""
+        if self._session is not None:
+            return self._session
+
+        import requests
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = _make_requests_adapter(self)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+        return self._session
+
+    # -- Métricas -------------------------------------------------------
+
+    def _record(self, host: str, trace: Optional[_ConnectionTrace]):
+        """Registra uma requisição (reusou conexão se não houve handshake)"""
+        handshake_s = trace.handshake_s if trace is not None else None
+        with self._lock:
+            stats = self._stats.setdefault(host, _HostStats())
+            stats.requests += 1
+            if handshake_s is not None:
+                stats.new_connections += 1
+                stats.handshake_s_sum += handshake_s
+                stats.handshake_s_max = max(stats.handshake_s_max, handshake_s)
+        self.metrics.http_request(host, reused=handshake_s is None)
+        if handshake_s is not None:
+            self.metrics.http_handshake_done(host, handshake_s)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Por host: requisições, conexões novas, taxa de reuso e handshake médio/máximo"""
+        with self._lock:
+            return {
+                host: {
+                    'requests': stats.requests,
+                    'new_connections': stats.new_connections,
+                    'reuse_rate': round(1 - stats.new_connections / stats.requests, 4)
+                    if stats.requests else 0.0,
+                    'avg_handshake_ms': round(stats.handshake_s_sum / stats.new_connections * 1000, 1)
+                    if stats.new_connections else None,
+                    'max_handshake_ms': round(stats.handshake_s_max * 1000, 1)
+                }
+                for host, stats in self._stats.items()
+            }
+
+    def close(self):
+        """Fecha os clientes síncronos e a sessão (os assíncronos fecham com o loop)"""
+        with self._lock:
+            for client in self._http_clients.values():
+                client.close()
+            self._http_clients.clear()
+            self._anthropic.clear()
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+def _make_requests_adapter(pool: ClientPool):
+    """
+    HTTPAdapter com pool por host do tamanho configurado, timeout padrão e
+    conexões urllib3 que medem o handshake
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    local = threading.local()
+
+    def timed(connection_cls):
+        class TimedConnection(connection_cls):
+            def connect(self):
+                started = time.perf_counter()
+                super().connect()
+                local.handshake_s = time.perf_counter() - started
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    class PooledAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool
+            }
+
+        def send(self, request, timeout=None, **kwargs):
+            if timeout is None:
+                timeout = (pool.connect_timeout, pool.read_timeout)
+            local.handshake_s = None
+            response = super().send(request, timeout=timeout, **kwargs)
+            trace = _ConnectionTrace()
+            trace.handshake_s = local.handshake_s
+            pool._record(urlsplit(request.url).netloc, trace)
+            return response
+
+    # pool_connections: hosts com pool em cache; pool_maxsize: conexões por host
+    return PooledAdapter(pool_connections=16, pool_maxsize=pool.max_connections_per_host,
+                         pool_block=True)
+
+
+# Singleton global
+_client_pool_instance = None
+_client_pool_lock = threading.Lock()
+
+def get_client_pool() -> ClientPool:
+    """
+    Retorna instância singleton configurada por variáveis de ambiente
+    ORCHESTRATOR_HTTP_MAX_CONNECTIONS_PER_HOST, ORCHESTRATOR_HTTP_KEEPALIVE_EXPIRY,
+    ORCHESTRATOR_HTTP_CONNECT_TIMEOUT, ORCHESTRATOR_HTTP_READ_TIMEOUT,
+    ORCHESTRATOR_HTTP_WRITE_TIMEOUT, ORCHESTRATOR_HTTP_POOL_TIMEOUT (segundos)
+    """
+    global _client_pool_instance
+
+    if _client_pool_instance is None:
+        with _client_pool_lock:
+            if _client_pool_instance is None:
+                _client_pool_instance = ClientPool(
+                    max_connections_per_host=int(os.getenv('ORCHESTRATOR_HTTP_MAX_CONNECTIONS_PER_HOST', '20')),
+                    keepalive_expiry=float(os.getenv('ORCHESTRATOR_HTTP_KEEPALIVE_EXPIRY', '30')),
+                    connect_timeout=float(os.getenv('ORCHESTRATOR_HTTP_CONNECT_TIMEOUT', '5')),
+                    read_timeout=float(os.getenv('ORCHESTRATOR_HTTP_READ_TIMEOUT', '600')),
+                    write_timeout=float(os.getenv('ORCHESTRATOR_HTTP_WRITE_TIMEOUT', '30')),
+                    pool_timeout=float(os.getenv('ORCHESTRATOR_HTTP_POOL_TIMEOUT', '10'))
+                )
+
+    return _client_pool_instance
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Prazos (deadlines) e cancelamento de chamadas a providers
+Contrato usado por BaseAgent.execute, ClaudeClient e o orquestrador: quem
+chama define o prazo (orçamento de latência da tarefa) e quem executa limita
+cada chamada ao tempo restante, desistindo com DeadlineExceededError
+"""
+
+import time
+import threading
+from typing import Any, Awaitable, Optional
+
+
+class DeadlineExceededError(TimeoutError):
+    """Prazo da chamada esgotado ou cancelado por quem chamou"""
+
+
+class Deadline:
+    """
+    Instante limite (relógio monotônico) com cancelamento cooperativo
+
+    Chamadas de rede usam remaining() como timeout; laços (streams, fan-out)
+    chamam check() entre etapas. cancel() encerra o prazo antes da hora, ex.:
+    quando o resultado deixou de interessar (hedge perdedor, ramo descartado).
+    """
+
+    def __init__(self, timeout: float, parent: Optional['Deadline'] = None):
+        """
+        Args:
+            timeout: Segundos a partir de agora
+            parent: Prazo externo; o menor dos dois vale e o cancelamento se propaga
+        """
+        self.expires_at = time.monotonic() + timeout
+        self.parent = parent
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_budget_ms(cls, budget_ms: Optional[float]) -> Optional['Deadline']:
+        """Prazo para um orçamento em ms (None ou <= 0: sem prazo)"""
+        if not budget_ms or budget_ms <= 0:
+            return None
+        return cls(budget_ms / 1000)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def cancel(self):
+        """Encerra o prazo imediatamente (chamadas cooperativas desistem no próximo check)"""
+        self._cancelled.set()
+
+    def remaining(self) -> float:
+        """Segundos restantes (0 se esgotado ou cancelado)"""
+        if self.cancelled:
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = "Chamada") -> float:
+        """Retorna os segundos restantes ou levanta DeadlineExceededError"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            reason = "cancelada" if self.cancelled else "excedeu o prazo"
+            raise DeadlineExceededError(f"{what} {reason}")
+        return remaining
+
+
+def bounded_client(client, deadline: Optional[Deadline], what: str = "Chamada"):
+    """
+    Cliente Anthropic limitado ao prazo: timeout igual ao tempo restante e sem
+    retentativas internas do SDK (a escalação por timeout faz esse papel)
+    """
+    if deadline is None:
+        return client
+    return client.with_options(timeout=deadline.check(what), max_retries=0)
+
+
+async def wait_async(awaitable: Awaitable[Any], deadline: Optional[Deadline],
+                     what: str = "Chamada") -> Any:
+    """Aguarda a corrotina até o prazo; ao esgotar, a cancela de fato"""
+    import asyncio
+    if deadline is None:
+        return await awaitable
+    try:
+        timeout = deadline.check(what)
+    except DeadlineExceededError:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceededError(f"{what} excedeu o prazo") from None
@@ -7,7 +7,7 @@ Integra com múltiplos modelos de IA e modos de otimização
 import os
 import json
 import logging
-import requests
+from client_pool import get_client_pool
 from typing import Dict, List, Optional, Any, Literal
 from dataclasses import dataclass
 from enum import Enum
@@ -80,7 +80,8 @@ class DeepSiteClient:
             api_base: URL base da API (padrão: usar Hugging Face Space)
         """
         self.api_base = api_base or "https://enzostvs-deepsite.hf.space"
-        self.session = requests.Session()
+        # Sessão HTTP compartilhada do processo (keep-alive e timeout padrão)
+        self.session = get_client_pool().session()
         self.logger = logging.getLogger("DeepSiteClient")
     
     def generate_website(
@@ -163,13 +164,12 @@ class DeepSiteClient:
         Simula geração do DeepSite usando Claude
         (até termos acesso à API oficial)
         """
-        from anthropic import Anthropic
-        
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY não configurada")
         
-        client = Anthropic(api_key=api_key)
+        # Cliente compartilhado: reaproveita as conexões TLS entre gerações
+        client = get_client_pool().anthropic(api_key)
         
         # Criar prompt otimizado para geração de HTML
         system_prompt = self._build_generation_prompt(config)
@@ -178,15 +178,18 @@ class DeepSiteClient:
         claude_model = self._select_claude_model(config.mode)
         
         # Gerar HTML
+        # Instruções de geração vão no parâmetro system (curtas demais para o
+        # prompt caching da API: ficam abaixo do mínimo de tokens cacheáveis)
         response = client.messages.create(
             model=claude_model,
             max_tokens=8000,
             messages=[
                 {
                     "role": "user",
-                    "content": f"{system_prompt}\n\nPROMPT DO USUÁRIO:\n{prompt}"
+                    "content": f"PROMPT DO USUÁRIO:\n{prompt}"
                 }
-            ]
+            ],
+            system=system_prompt
         )
         
         html_code = response.content[0].text
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Métricas Prometheus da Orquestração Multi-IA
+Histogramas de latência por etapa de process_task e por chamada a provider,
+contadores de escalação e de tarefas, expostos em /metrics (processos de longa
+duração) ou enviados ao Pushgateway (execuções curtas, uma tarefa por processo;
+apenas o snapshot da última execução, sem agregação entre execuções)
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Formato de exposição em texto do Prometheus
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Buckets em segundos: de etapas em memória (ms) a chamadas longas de modelo
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Etapas instrumentadas em process_task
+STAGES = (
+    'complexity_analysis',    # ComplexityAnalyzer
+    'provider_selection',     # Seleção do provider inicial (saúde + roteador)
+    'audit',                  # Escritas no audit logger
+    'db_begin',               # Abertura da unidade de trabalho
+    'execution',              # Execução no provider inicial (inclui hedge/map-reduce)
+    'confidence_evaluation',  # Avaliação de confiança
+    'escalation',             # Escalação completa (seleção do alvo + nova execução)
+    'db_commit',              # Gravação final da tarefa
+    'total',                  # process_task de ponta a ponta
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monotônico com labels"""
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """Histograma cumulativo com labels (buckets em segundos)"""
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # labels → [contagem por bucket (não cumulativa), soma, total]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.label_names, key, ('le', _format_value(bound)))
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _format_labels(self.label_names, key)
+                lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+                lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class OrchestratorMetrics:
+    """
+    Métricas do orquestrador
+
+    stage() mede uma etapa de process_task; provider_call() é registrada
+    pelo orquestrador a cada chamada a um provider (sucesso, erro ou rejeição
+    pelo circuit breaker).
+    """
+
+    def __init__(self, namespace: str = 'orchestrator'):
+        self.stage_duration = Histogram(
+            f'{namespace}_stage_duration_seconds',
+            'Duração das etapas de process_task em segundos',
+            ('stage',)
+        )
+        self.provider_call_duration = Histogram(
+            f'{namespace}_provider_call_duration_seconds',
+            'Duração das chamadas aos providers em segundos',
+            ('provider', 'outcome')
+        )
+        self.escalations = Counter(
+            f'{namespace}_escalations_total',
+            'Total de escalações entre providers',
+            ('from_provider', 'to_provider', 'trigger')
+        )
+        self.tasks = Counter(
+            f'{namespace}_tasks_total',
+            'Total de tarefas processadas por status',
+            ('status',)
+        )
+        self.http_requests = Counter(
+            f'{namespace}_http_requests_total',
+            'Requisições HTTP do pool de clientes por host e conexão (new/reused)',
+            ('host', 'connection')
+        )
+        self.http_handshake = Histogram(
+            f'{namespace}_http_handshake_seconds',
+            'Duração do handshake (TCP + TLS) das conexões novas do pool em segundos',
+            ('host',)
+        )
+        self.audit_events = Counter(
+            f'{namespace}_audit_events_total',
+            'Eventos de auditoria por desfecho (written, dropped, failed)',
+            ('outcome',)
+        )
+        self.audit_flush = Histogram(
+            f'{namespace}_audit_flush_seconds',
+            'Duração de cada lote gravado pelo writer de auditoria em segundos'
+        )
+        self._metrics = (self.stage_duration, self.provider_call_duration, self.escalations, self.tasks,
+                         self.http_requests, self.http_handshake, self.audit_events, self.audit_flush)
+        self._server = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mede a duração de uma etapa (registrada mesmo se a etapa falhar)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_duration.observe(time.perf_counter() - started, stage=name)
+
+    def observe_stage(self, name: str, seconds: float):
+        self.stage_duration.observe(seconds, stage=name)
+
+    def provider_call(self, provider: str, seconds: float, outcome: str):
+        self.provider_call_duration.observe(seconds, provider=provider, outcome=outcome)
+
+    def escalation(self, from_provider: str, to_provider: str, trigger: str):
+        self.escalations.inc(from_provider=from_provider, to_provider=to_provider, trigger=trigger)
+
+    def task(self, status: str):
+        self.tasks.inc(status=status)
+
+    def http_request(self, host: str, reused: bool):
+        self.http_requests.inc(host=host, connection='reused' if reused else 'new')
+
+    def http_handshake_done(self, host: str, seconds: float):
+        self.http_handshake.observe(seconds, host=host)
+
+    def audit_event(self, outcome: str, count: int = 1):
+        self.audit_events.inc(count, outcome=outcome)
+
+    def audit_flush_done(self, seconds: float):
+        self.audit_flush.observe(seconds)
+
+    def render(self) -> bytes:
+        """Todas as métricas no formato de exposição em texto"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def start_http_server(self, port: int, addr: str = '0.0.0.0'):
+        """Expõe GET /metrics em uma thread daemon"""
+        # Import tardio: só processos de longa duração expõem o endpoint
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        if self._server:
+            return
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((addr, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='orchestrator-metrics',
+                         daemon=True).start()
+        logger.info(f"📈 Métricas Prometheus em http://{addr}:{port}/metrics")
+
+    def push(self, gateway_url: str, job: str, instance: Optional[str] = None,
+             timeout: float = 5.0):
+        """
+        Envia as métricas ao Pushgateway (POST: substitui apenas as métricas
+        com o mesmo nome no grupo job/instance)
+        
+        O Pushgateway não soma envios: cada push sobrescreve o anterior do
+        grupo, então o que fica exposto é o snapshot da última execução e não
+        um contador acumulado. rate()/increase() sobre essas séries não tem
+        significado; para taxas e quantis use o endpoint /metrics de um
+        processo de longa duração (ex.: workers do task_queue).
+        """
+        import urllib.request
+        url = f"{gateway_url.rstrip('/')}/metrics/job/{job}"
+        if instance:
+            url += f"/instance/{instance}"
+        request = urllib.request.Request(url, data=self.render(), method='POST',
+                                         headers={'Content-Type': CONTENT_TYPE})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout):
+                pass
+        except OSError as e:
+            logger.error(f"❌ Erro ao enviar métricas ao Pushgateway: {e}")
+
+
+# Singleton global
+_metrics_instance = None
+
+def get_metrics() -> OrchestratorMetrics:
+    """
+    Retorna instância singleton configurada por variáveis de ambiente
+    ORCHESTRATOR_METRICS_PORT: inicia o endpoint /metrics nesta porta
+    ORCHESTRATOR_PUSHGATEWAY_URL: envia as métricas ao Pushgateway na saída do processo
+        (snapshot por execução, job ORCHESTRATOR_METRICS_JOB, padrão orchestrator_push)
+    """
+    global _metrics_instance
+
+    if _metrics_instance is None:
+        _metrics_instance = OrchestratorMetrics()
+
+        port = os.getenv('ORCHESTRATOR_METRICS_PORT')
+        if port:
+            try:
+                _metrics_instance.start_http_server(
+                    int(port), os.getenv('ORCHESTRATOR_METRICS_ADDR', '0.0.0.0')
+                )
+            except OSError as e:
+                logger.error(f"❌ Erro ao iniciar endpoint de métricas na porta {port}: {e}")
+
+        gateway_url = os.getenv('ORCHESTRATOR_PUSHGATEWAY_URL')
+        if gateway_url:
+            atexit.register(
+                _metrics_instance.push, gateway_url,
+                os.getenv('ORCHESTRATOR_METRICS_JOB', 'orchestrator_push'),
+                os.getenv('ORCHESTRATOR_METRICS_INSTANCE') or None
+            )
+
+    return _metrics_instance
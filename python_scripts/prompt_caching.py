@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Prompt Caching da API do Claude
+Monta o parâmetro system com cache_control para prefixos longos e estáveis e
+extrai/precifica os tokens de leitura e escrita de cache
+"""
+
+import os
+from typing import Dict, Any, List, Optional, Union
+
+# Multiplicadores sobre o preço de entrada (tabela de preços da Anthropic)
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+# Prefixos menores que isso não são cacheados pela API (~4 caracteres por token)
+MIN_CACHEABLE_TOKENS = int(os.getenv('ORCHESTRATOR_PROMPT_CACHE_MIN_TOKENS', '1024'))
+
+# Campos de uso de tokens devolvidos pela API
+USAGE_FIELDS = ('input_tokens', 'output_tokens',
+                'cache_creation_input_tokens', 'cache_read_input_tokens')
+
+
+def build_system(system_prompt: Optional[str],
+                 min_tokens: int = MIN_CACHEABLE_TOKENS) -> Union[str, List[Dict[str, Any]], None]:
+    """
+    Valor do parâmetro system de messages.create
+
+    Prompts longos viram um bloco de texto marcado com cache_control, para
+    que chamadas seguintes com o mesmo prefixo leiam do cache da API.
+    """
+    if not system_prompt:
+        return None
+    if len(system_prompt) // 4 < min_tokens:
+        return system_prompt
+    return [{
+        "type": "text",
+        "text": system_prompt,
+        "cache_control": {"type": "ephemeral"}
+    }]
+
+
+def request_kwargs(system_prompt: Optional[str]) -> Dict[str, Any]:
+    """Argumentos extras de messages.create (vazio se não houver system prompt)"""
+    system = build_system(system_prompt)
+    return {'system': system} if system is not None else {}
+
+
+def extract_usage(usage) -> Dict[str, int]:
+    """Uso de tokens da resposta, incluindo leitura/escrita de cache (0 se ausente)"""
+    return {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+
+
+def input_cost(price_per_token: float, usage: Dict[str, int]) -> float:
+    """Custo de entrada considerando tokens não cacheados, escrita e leitura de cache"""
+    return price_per_token * (
+        usage.get('input_tokens', 0)
+        + usage.get('cache_creation_input_tokens', 0) * CACHE_WRITE_MULTIPLIER
+        + usage.get('cache_read_input_tokens', 0) * CACHE_READ_MULTIPLIER
+    )
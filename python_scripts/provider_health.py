@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Saúde dos Providers para Orquestração Multi-IA
+Circuit breaker e limite de concorrência adaptativo (AIMD) por provider, para
+que um provider degradado seja evitado antes da chamada em vez de após o erro
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import Enum
+from typing import Dict, Any, List, Optional, Tuple
+
+from deadline import Deadline, wait_async
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """Estados do circuit breaker"""
+    CLOSED = "closed"        # Normal
+    OPEN = "open"            # Chamadas bloqueadas até o fim do cooldown
+    HALF_OPEN = "half_open"  # Chamadas de teste liberadas
+
+
+class ProviderUnavailableError(Exception):
+    """Provider com circuito aberto (ou semiaberto sem vaga de teste)"""
+    pass
+
+
+class ProviderHealth:
+    """
+    Estado de saúde de um provider
+
+    Mantém taxa de erro em janela deslizante, EWMA da latência, estado do
+    circuito e limite de concorrência AIMD (aumento aditivo a cada sucesso,
+    redução multiplicativa em falhas ou respostas lentas). Só o circuito torna
+    o provider indisponível; no limite de concorrência as chamadas aguardam
+    vaga. A redução vale uma vez por evento de congestionamento: chamadas
+    iniciadas antes da última redução não reduzem de novo.
+    """
+
+    def __init__(self, name: str, window_seconds: float, min_requests: int,
+                 error_threshold: float, cooldown_seconds: float, half_open_probes: int,
+                 initial_limit: float, min_limit: float, max_limit: float,
+                 slow_call_ms: float, ewma_alpha: float = 0.2):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_threshold = error_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_probes = half_open_probes
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.slow_call_ms = slow_call_ms
+        self.ewma_alpha = ewma_alpha
+
+        self.state = CircuitState.CLOSED
+        self.limit = initial_limit
+        self.in_flight = 0
+        self.latency_ewma_ms: Optional[float] = None
+        self._outcomes: deque = deque()  # (timestamp, sucesso)
+        self._opened_at = 0.0
+        self._last_decrease = 0.0
+        self._probes = 0
+        self._stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'waited': 0,
+                       'decreases': 0, 'opened': 0}
+
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def error_rate(self, now: Optional[float] = None) -> float:
+        self._trim(now or time.monotonic())
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def _refresh_state(self, now: float):
+        if self.state == CircuitState.OPEN and now - self._opened_at >= self.cooldown_seconds:
+            self.state = CircuitState.HALF_OPEN
+            self._probes = 0
+            logger.info(f"🔌 Circuito de {self.name} semiaberto: liberando chamadas de teste")
+
+    def is_available(self, now: float) -> bool:
+        """Circuito aceita novas chamadas (independe do limite de concorrência)"""
+        self._refresh_state(now)
+        if self.state == CircuitState.OPEN:
+            return False
+        if self.state == CircuitState.HALF_OPEN:
+            return self._probes < self.half_open_probes
+        return True
+
+    def try_acquire(self, now: float, waited: bool = False) -> Optional[bool]:
+        """
+        Reserva uma vaga de execução
+        Retorna None se o circuito não aceita chamadas e False se o limite de
+        concorrência está cheio (waited: a chamada já estava aguardando vaga)
+        """
+        if not self.is_available(now):
+            self._stats['rejected'] += 1
+            return None
+        if self.in_flight >= max(1, int(self.limit)):
+            if not waited:
+                self._stats['waited'] += 1
+            return False
+        if self.state == CircuitState.HALF_OPEN:
+            self._probes += 1
+        self.in_flight += 1
+        return True
+
+    def release(self, now: float, success: Optional[bool], latency_ms: float, started: float):
+        """
+        Libera a vaga e registra o resultado
+        success=None: chamada cancelada pelo chamador (não afeta a saúde)
+        started: início da chamada (chamadas anteriores à última redução não reduzem de novo)
+        """
+        self.in_flight -= 1
+        if success is None:
+            if self.state == CircuitState.HALF_OPEN:
+                self._probes -= 1
+            return
+
+        self._outcomes.append((now, success))
+        self._trim(now)
+        self.latency_ewma_ms = latency_ms if self.latency_ewma_ms is None else \
+            self.ewma_alpha * latency_ms + (1 - self.ewma_alpha) * self.latency_ewma_ms
+
+        slow = self.slow_call_ms > 0 and latency_ms > self.slow_call_ms
+        if success and not slow:
+            self._stats['successes'] += 1
+            # Aumento aditivo: +1 no limite a cada janela cheia de sucessos
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        else:
+            self._stats['successes' if success else 'failures'] += 1
+            # Redução multiplicativa, uma vez por evento de congestionamento
+            if started >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit / 2)
+                self._last_decrease = now
+                self._stats['decreases'] += 1
+
+        if self.state == CircuitState.HALF_OPEN:
+            if success:
+                self.state = CircuitState.CLOSED
+                self._outcomes.clear()
+                logger.info(f"✅ Circuito de {self.name} fechado")
+            else:
+                self._open(now)
+        elif (self.state == CircuitState.CLOSED and not success
+              and len(self._outcomes) >= self.min_requests
+              and self.error_rate(now) >= self.error_threshold):
+            self._open(now)
+
+    def _open(self, now: float):
+        self.state = CircuitState.OPEN
+        self._opened_at = now
+        self._stats['opened'] += 1
+        logger.warning(
+            f"🚫 Circuito de {self.name} aberto por {self.cooldown_seconds:.0f}s "
+            f"(taxa de erro {self.error_rate(now):.0%})"
+        )
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        self._refresh_state(now)
+        return {
+            'state': self.state.value,
+            'error_rate': round(self.error_rate(now), 4),
+            'requests_in_window': len(self._outcomes),
+            'latency_ewma_ms': round(self.latency_ewma_ms, 1) if self.latency_ewma_ms is not None else None,
+            'concurrency_limit': round(self.limit, 2),
+            'in_flight': self.in_flight,
+            **self._stats
+        }
+
+
+class ProviderHealthRegistry:
+    """Saúde de todos os providers (thread-safe)"""
+
+    def __init__(self, window_seconds: float = 60, min_requests: int = 10,
+                 error_threshold: float = 0.5, cooldown_seconds: float = 30,
+                 half_open_probes: int = 1, initial_limit: float = 8,
+                 min_limit: float = 1, max_limit: float = 64, slow_call_ms: float = 30000):
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_threshold = error_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_probes = half_open_probes
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.slow_call_ms = slow_call_ms
+
+        self._providers: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        # Chamadas aguardando vaga: threads na condição, corrotinas em futures
+        self._capacity = threading.Condition(self._lock)
+        self._async_waiters: Dict[str, List[Tuple[Any, Any]]] = {}
+
+    def _get(self, name: str, initial_limit: Optional[float] = None) -> ProviderHealth:
+        health = self._providers.get(name)
+        if health is None:
+            limit = initial_limit or self.initial_limit
+            health = ProviderHealth(
+                name, self.window_seconds, self.min_requests, self.error_threshold,
+                self.cooldown_seconds, self.half_open_probes,
+                initial_limit=limit, min_limit=self.min_limit,
+                max_limit=max(self.max_limit, limit), slow_call_ms=self.slow_call_ms
+            )
+            self._providers[name] = health
+        return health
+
+    def is_available(self, name: str) -> bool:
+        """Circuito não está aberto (um provider só saturado continua disponível)"""
+        with self._lock:
+            return self._get(name).is_available(time.monotonic())
+
+    def _try_admit(self, name: str, initial_limit: Optional[float], waited: bool) -> bool:
+        """
+        Reserva uma vaga se houver (com self._lock)
+        Levanta ProviderUnavailableError se o circuito não aceita chamadas
+        """
+        admitted = self._get(name, initial_limit).try_acquire(time.monotonic(), waited)
+        if admitted is None:
+            raise ProviderUnavailableError(f"Provider indisponível: {name}")
+        return admitted
+
+    def _acquire(self, name: str, initial_limit: Optional[float], deadline: Optional[Deadline]):
+        """Aguarda vaga no limite de concorrência até o prazo"""
+        with self._capacity:
+            waited = False
+            while not self._try_admit(name, initial_limit, waited):
+                waited = True
+                timeout = deadline.check(f"{name} (aguardando vaga)") if deadline is not None else None
+                self._capacity.wait(timeout)
+
+    async def _acquire_async(self, name: str, initial_limit: Optional[float],
+                             deadline: Optional[Deadline]):
+        """Versão asyncio de _acquire (aguarda em um future, sem bloquear o loop)"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        waited = False
+        while True:
+            with self._lock:
+                if self._try_admit(name, initial_limit, waited):
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.setdefault(name, []).append((loop, waiter))
+            waited = True
+            await wait_async(waiter, deadline, f"{name} (aguardando vaga)")
+
+    def _release(self, name: str, success: Optional[bool], started: float):
+        """Registra o resultado e acorda quem aguarda vaga no provider"""
+        now = time.monotonic()
+        with self._lock:
+            self._providers[name].release(now, success, (now - started) * 1000, started)
+            self._capacity.notify_all()
+            waiters = self._async_waiters.pop(name, [])
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    @contextmanager
+    def track(self, name: str, initial_limit: Optional[float] = None,
+              deadline: Optional[Deadline] = None):
+        """
+        Envolve uma chamada ao provider
+
+        Rejeita com ProviderUnavailableError se o circuito estiver aberto. No
+        limite de concorrência aguarda vaga até o deadline (DeadlineExceededError).
+        Exceções contam como falha; interrupções do chamador (GeneratorExit,
+        cancelamento) não afetam a saúde.
+        """
+        self._acquire(name, initial_limit, deadline)
+        started = time.monotonic()
+        success: Optional[bool] = None
+        try:
+            yield
+            success = True
+        except Exception:
+            success = False
+            raise
+        finally:
+            self._release(name, success, started)
+
+    @asynccontextmanager
+    async def track_async(self, name: str, initial_limit: Optional[float] = None,
+                          deadline: Optional[Deadline] = None):
+        """Versão asyncio de track"""
+        await self._acquire_async(name, initial_limit, deadline)
+        started = time.monotonic()
+        success: Optional[bool] = None
+        try:
+            yield
+            success = True
+        except Exception:
+            success = False
+            raise
+        finally:
+            self._release(name, success, started)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Estado do circuito, taxa de erro, latência e limite por provider"""
+        now = time.monotonic()
+        with self._lock:
+            return {name: health.snapshot(now) for name, health in self._providers.items()}
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# Singleton global
+_provider_health_instance = None
+
+def get_provider_health() -> ProviderHealthRegistry:
+    """Retorna instância singleton configurada por variáveis de ambiente"""
+    global _provider_health_instance
+
+    if _provider_health_instance is None:
+        _provider_health_instance = ProviderHealthRegistry(
+            window_seconds=float(os.getenv('ORCHESTRATOR_HEALTH_WINDOW', '60')),
+            min_requests=int(os.getenv('ORCHESTRATOR_HEALTH_MIN_REQUESTS', '10')),
+            error_threshold=float(os.getenv('ORCHESTRATOR_HEALTH_ERROR_THRESHOLD', '0.5')),
+            cooldown_seconds=float(os.getenv('ORCHESTRATOR_HEALTH_COOLDOWN', '30')),
+            half_open_probes=int(os.getenv('ORCHESTRATOR_HEALTH_HALF_OPEN_PROBES', '1')),
+            initial_limit=float(os.getenv('ORCHESTRATOR_PROVIDER_CONCURRENCY', '8')),
+            min_limit=float(os.getenv('ORCHESTRATOR_HEALTH_MIN_CONCURRENCY', '1')),
+            max_limit=float(os.getenv('ORCHESTRATOR_HEALTH_MAX_CONCURRENCY', '64')),
+            slow_call_ms=float(os.getenv('ORCHESTRATOR_HEALTH_SLOW_CALL_MS', '30000'))
+        )
+
+    return _provider_health_instance
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Cache de Respostas para Orquestração Multi-IA
+Evita chamadas repetidas aos providers para entradas idênticas
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Cache de respostas com correspondência exata
+
+    Camada em memória (LRU limitado por quantidade de entradas) com camada
+    opcional em disco (SQLite) que sobrevive a reinícios do processo. As
+    entradas expiram após o TTL em ambas as camadas.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600,
+                 sqlite_path: Optional[str] = None, max_disk_entries: int = 10000):
+        """
+        Args:
+            max_entries: Máximo de entradas na camada em memória
+            ttl_seconds: Tempo de vida das entradas
+            sqlite_path: Caminho do arquivo SQLite (None desativa a camada em disco)
+            max_disk_entries: Máximo de entradas na camada em disco
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expired': 0
+        }
+
+        self._disk = None
+        if sqlite_path:
+            self._open_disk(sqlite_path)
+
+    def _open_disk(self, path: str):
+        """Abre (ou cria) a camada SQLite"""
+        try:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_access ON response_cache(last_access)"
+            )
+            self._disk.commit()
+            logger.info(f"✅ Cache de respostas em disco: {path}")
+        except sqlite3.Error as e:
+            logger.error(f"❌ Erro ao abrir cache em disco ({path}): {e}")
+            self._disk = None
+
+    @property
+    def persistent(self) -> bool:
+        """Camada em disco ativa (get/set fazem I/O no SQLite)"""
+        return self._disk is not None
+
+    @staticmethod
+    def make_key(input_text: str, model: str, max_tokens: Optional[int],
+                 system: Optional[str] = None) -> str:
+        """
+        Gera chave do cache a partir da entrada normalizada, modelo, max_tokens
+        e system prompt (quando houver)
+
+        A normalização remove espaços nas bordas e colapsa espaços internos;
+        maiúsculas/minúsculas são preservadas.
+        """
+        normalized = " ".join(input_text.split())
+        parts = [normalized, model, max_tokens]
+        if system:
+            parts.append(" ".join(system.split()))
+        payload = json.dumps(parts, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Busca resposta no cache (memória e depois disco)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats['hits'] += 1
+                    self._stats['memory_hits'] += 1
+                    return dict(value)
+                del self._memory[key]
+                self._stats['expired'] += 1
+
+            value = self._disk_get(key, now)
+            if value is not None:
+                self._stats['hits'] += 1
+                self._stats['disk_hits'] += 1
+                return dict(value)
+
+            self._stats['misses'] += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Armazena resposta no cache"""
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+            self._stats['stores'] += 1
+
+            if self._disk is not None:
+                try:
+                    self._disk.execute(
+                        "INSERT OR REPLACE INTO response_cache (key, value, created_at, last_access) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False), now, now)
+                    )
+                    self._trim_disk()
+                    self._disk.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"❌ Erro ao gravar cache em disco: {e}")
+
+    def _memory_put(self, key: str, value: Dict[str, Any], created_at: float):
+        """Insere na camada em memória respeitando o limite (LRU)"""
+        self._memory[key] = (created_at, dict(value))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Busca na camada em disco e promove para a memória"""
+        if self._disk is None:
+            return None
+        try:
+            row = self._disk.execute(
+                "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at >= self.ttl_seconds:
+                self._disk.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._disk.commit()
+                self._stats['expired'] += 1
+                return None
+            self._disk.execute(
+                "UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._disk.commit()
+            value = json.loads(value)
+            self._memory_put(key, value, created_at)
+            return value
+        except sqlite3.Error as e:
+            logger.error(f"❌ Erro ao ler cache em disco: {e}")
+            return None
+
+    def _trim_disk(self):
+        """Remove entradas expiradas e as menos acessadas acima do limite"""
+        self._disk.execute(
+            "DELETE FROM response_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        self._disk.execute("""
+            DELETE FROM response_cache WHERE key IN (
+                SELECT key FROM response_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_disk_entries,))
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM response_cache")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas do cache (inclui taxa de acerto)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self):
+        """Fecha a camada em disco"""
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+
+# Singleton global
+_response_cache_instance = None
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Retorna instância singleton do cache configurada por variáveis de ambiente
+    (None se ORCHESTRATOR_CACHE_ENABLED=0)
+    """
+    global _response_cache_instance
+
+    if os.getenv('ORCHESTRATOR_CACHE_ENABLED', '1') == '0':
+        return None
+
+    if _response_cache_instance is None:
+        _response_cache_instance = ResponseCache(
+            max_entries=int(os.getenv('ORCHESTRATOR_CACHE_MAX_ENTRIES', '1000')),
+            ttl_seconds=float(os.getenv('ORCHESTRATOR_CACHE_TTL', '3600')),
+            sqlite_path=os.getenv('ORCHESTRATOR_CACHE_SQLITE_PATH') or None,
+            max_disk_entries=int(os.getenv('ORCHESTRATOR_CACHE_MAX_DISK_ENTRIES', '10000'))
+        )
+
+    return _response_cache_instance
+
+
+if __name__ == "__main__":
+    # Teste
+    cache = ResponseCache(max_entries=2, sqlite_path="/tmp/orchestrator_response_cache.db")
+
+    key = ResponseCache.make_key("  Olá,   como você está? ", "claude-3-5-haiku-20241022", 4096)
+    cache.set(key, {'output': 'Tudo bem!', 'input_tokens': 10, 'output_tokens': 5})
+
+    same_key = ResponseCache.make_key("Olá, como você está?", "claude-3-5-haiku-20241022", 4096)
+    print(f"Hit normalizado: {cache.get(same_key)}")
+    print(f"Miss: {cache.get(ResponseCache.make_key('outra', 'x', 1))}")
+    print(json.dumps(cache.stats(), indent=2))
+
+    cache.close()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Coalescência de Chamadas em Andamento (singleflight)
+Chamadas concorrentes com a mesma chave compartilham uma única execução: a
+primeira (líder) executa e as demais aguardam o mesmo resultado ou erro (erros
+próprios do líder, como o prazo dele, fazem cada seguidor executar a sua)
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """Execução em andamento de uma chave"""
+
+    __slots__ = ('owner', 'event', 'result', 'error')
+
+    def __init__(self, owner: Optional[str]):
+        self.owner = owner
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncCall:
+    """Execução assíncrona em andamento de uma chave (task compartilhada)"""
+
+    __slots__ = ('owner', 'task', 'waiters')
+
+    def __init__(self, owner: Optional[str], task: 'asyncio.Future'):
+        self.owner = owner
+        self.task = task
+        self.waiters = 1
+
+
+class SingleFlight:
+    """
+    Coalescência de chamadas idênticas em andamento
+
+    do() serve threads e do_async() corrotinas (por event loop). Ambos
+    retornam (resultado, dono da execução líder ou None se o chamador foi o
+    líder). Apenas chamadas simultâneas são coalescidas: ao terminar, a chave
+    é liberada e a próxima chamada executa de novo (o cache de respostas
+    cobre resultados já concluídos).
+
+    Só erros determinísticos são compartilhados: se o líder falha com um dos
+    local_errors (prazo do próprio líder, circuito aberto no momento) ou o
+    seguidor cansa de esperar, o seguidor executa func por conta própria.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None,
+                 local_errors: Tuple[Type[BaseException], ...] = (TimeoutError,)):
+        """
+        Args:
+            enabled: Coalescência ativa (padrão: ORCHESTRATOR_COALESCE_ENABLED)
+            local_errors: Erros do líder que não são repassados aos seguidores
+        """
+        if enabled is None:
+            enabled = os.getenv('ORCHESTRATOR_COALESCE_ENABLED', '1').lower() not in ('0', 'false', 'no')
+        self.enabled = enabled
+        self.local_errors = local_errors
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Tuple[int, str], _AsyncCall] = {}
+        self._lock = threading.Lock()
+        self._stats = {'executions': 0, 'coalesced': 0, 'shared_errors': 0, 'retried': 0}
+
+    def do(self, key: str, owner: Optional[str], func: Callable[[], Any],
+           timeout: Optional[float] = None) -> Tuple[Any, Optional[str]]:
+        """
+        Executa func, ou aguarda a execução em andamento com a mesma chave
+        timeout: espera máxima de quem aguarda (depois dela o seguidor executa func;
+                 a execução líder segue)
+        """
+        if not self.enabled:
+            return func(), None
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call(owner)
+                self._stats['executions'] += 1
+                leader = True
+            else:
+                self._stats['coalesced'] += 1
+                leader = False
+
+        if not leader:
+            logger.info(f"🔗 Chamada idêntica em andamento, aguardando {call.owner}")
+            if not call.event.wait(timeout):
+                logger.warning(f"⚠️ Execução de {call.owner} não terminou no prazo, executando sem aguardar")
+                return self._retry(func), None
+            if isinstance(call.error, self.local_errors):
+                logger.warning(f"⚠️ Execução de {call.owner} falhou ({type(call.error).__name__}), "
+                               f"executando novamente")
+                return self._retry(func), None
+            if call.error is not None:
+                with self._lock:
+                    self._stats['shared_errors'] += 1
+                raise call.error
+            return call.result, call.owner
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, None
+
+    def _retry(self, func: Callable[[], Any]) -> Any:
+        """Execução própria do seguidor, fora da coalescência"""
+        with self._lock:
+            self._stats['retried'] += 1
+        return func()
+
+    async def do_async(self, key: str, owner: Optional[str],
+                       factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, Optional[str]]:
+        """
+        Versão asyncio de do()
+
+        A execução roda em uma task compartilhada; o cancelamento de um
+        chamador só cancela a execução quando não resta nenhum aguardando.
+        """
+        import asyncio
+        if not self.enabled:
+            return await factory(), None
+
+        slot = (id(asyncio.get_running_loop()), key)
+        call = self._async_calls.get(slot)
+        if call is None:
+            task = asyncio.ensure_future(factory())
+            call = self._async_calls[slot] = _AsyncCall(owner, task)
+            task.add_done_callback(lambda _: self._release_async(slot, call))
+            with self._lock:
+                self._stats['executions'] += 1
+            leader = True
+        else:
+            call.waiters += 1
+            with self._lock:
+                self._stats['coalesced'] += 1
+            logger.info(f"🔗 Chamada idêntica em andamento, aguardando {call.owner}")
+            leader = False
+
+        try:
+            result = await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            call.waiters -= 1
+            if call.waiters == 0:
+                # Ninguém mais aguarda: novas chamadas não devem herdar o cancelamento
+                self._release_async(slot, call)
+                call.task.cancel()
+            raise
+        except BaseException as e:
+            call.waiters -= 1
+            if leader:
+                raise
+            if isinstance(e, self.local_errors):
+                logger.warning(f"⚠️ Execução de {call.owner} falhou ({type(e).__name__}), "
+                               f"executando novamente")
+                with self._lock:
+                    self._stats['retried'] += 1
+                return await factory(), None
+            with self._lock:
+                self._stats['shared_errors'] += 1
+            raise
+        call.waiters -= 1
+        return result, None if leader else call.owner
+
+    def _release_async(self, slot: Tuple[int, str], call: _AsyncCall):
+        if self._async_calls.get(slot) is call:
+            del self._async_calls[slot]
+
+    def stats(self) -> Dict[str, Any]:
+        """Execuções reais, chamadas coalescidas, reexecuções e chaves em andamento"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls) + len(self._async_calls)
+        total = stats['executions'] + stats['coalesced']
+        stats['coalesce_rate'] = round(stats['coalesced'] / total, 4) if total else 0.0
+        return stats
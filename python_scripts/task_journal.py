@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Journal de Tarefas (write-ahead) para Orquestração Multi-IA
+Registra o estado das tarefas em arquivo antes da gravação no banco, permitindo
+recuperar tarefas em andamento ou não gravadas após uma queda do processo
+Cada arquivo pertence a um único processo (lock exclusivo em <path>.lock)
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Campos datetime serializados em ISO 8601 no journal
+DATETIME_FIELDS = ('started_at', 'completed_at')
+
+
+class JournalLockedError(RuntimeError):
+    """Journal já aberto por outro processo"""
+
+
+class TaskJournal:
+    """
+    Journal append-only em JSON lines
+
+    Cada tarefa gera os registros:
+        begin      - tarefa planejada (linha inicial de ai_task_executions)
+        escalation - escalação registrada em memória
+        complete   - estado final calculado
+        commit     - estado final gravado no banco
+
+    Tarefas sem 'commit' são devolvidas por pending() para reprocessamento.
+    Processos que compartilham o arquivo recuperariam (e, na compactação,
+    descartariam) tarefas vivas uns dos outros, por isso o journal é aberto
+    com lock exclusivo: um segundo TaskJournal no mesmo caminho levanta
+    JournalLockedError.
+    """
+
+    def __init__(self, path: str, fsync: bool = False, compact_every: int = 1000):
+        """
+        Args:
+            path: Caminho do arquivo do journal
+            fsync: Força fsync a cada registro (mais seguro, mais lento)
+            compact_every: Compacta o arquivo a cada N commits (0 desativa)
+        """
+        self.path = path
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self._commits = 0
+        self._lock = threading.Lock()
+        # Lock em arquivo separado: a compactação troca o inode do journal
+        self._lock_file = self._acquire_lock(path)
+        self._file = open(path, 'a', encoding='utf-8')
+        logger.info(f"✅ Journal de tarefas: {path}")
+
+    @staticmethod
+    def _acquire_lock(path: str):
+        if fcntl is None:
+            return None
+        lock_file = open(path + '.lock', 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise JournalLockedError(f"Journal em uso por outro processo: {path}")
+        return lock_file
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Tipo não serializável no journal: {type(value).__name__}")
+
+    def append(self, op: str, task_id: str, data: Optional[Dict[str, Any]] = None):
+        """Acrescenta um registro ao journal"""
+        line = json.dumps({'op': op, 'task_id': task_id, 'data': data},
+                          ensure_ascii=False, default=self._encode)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            if op == 'commit':
+                self._commits += 1
+                if self.compact_every and self._commits >= self.compact_every:
+                    self._compact()
+
+    def pending(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Tarefas sem registro de commit, na ordem do journal
+
+        Returns:
+            {task_id: {'task': dict, 'escalations': [dict], 'updates': dict | None}}
+        """
+        with self._lock:
+            return self._read_pending()
+
+    def _read_pending(self) -> Dict[str, Dict[str, Any]]:
+        tasks: Dict[str, Dict[str, Any]] = {}
+        self._file.flush()
+        with open(self.path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Última linha truncada por queda durante a escrita
+                    logger.warning(f"⚠️ Registro inválido no journal (linha {number}), ignorando")
+                    continue
+                task_id, data = record['task_id'], record['data']
+                if record['op'] == 'begin':
+                    tasks[task_id] = {'task': self._decode(data), 'escalations': [], 'updates': None}
+                elif task_id not in tasks:
+                    continue
+                elif record['op'] == 'escalation':
+                    tasks[task_id]['escalations'].append(data)
+                elif record['op'] == 'complete':
+                    tasks[task_id]['updates'] = self._decode(data)
+                elif record['op'] == 'commit':
+                    del tasks[task_id]
+        return tasks
+
+    @staticmethod
+    def _decode(data: Dict[str, Any]) -> Dict[str, Any]:
+        for name in DATETIME_FIELDS:
+            if data.get(name):
+                data[name] = datetime.fromisoformat(data[name])
+        return data
+
+    def compact(self):
+        """Reescreve o journal mantendo apenas tarefas sem commit"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        pending = self._read_pending()
+        self._file.close()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for task_id, state in pending.items():
+                records = [('begin', state['task'])]
+                records += [('escalation', escalation) for escalation in state['escalations']]
+                if state['updates'] is not None:
+                    records.append(('complete', state['updates']))
+                for op, data in records:
+                    f.write(json.dumps({'op': op, 'task_id': task_id, 'data': data},
+                                       ensure_ascii=False, default=self._encode) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._commits = 0
+
+    def close(self):
+        """Fecha o arquivo do journal e libera o lock"""
+        with self._lock:
+            self._file.close()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+
+# Singleton global
+_task_journal_instance = None
+
+def get_task_journal() -> Optional[TaskJournal]:
+    """
+    Retorna instância singleton do journal configurada por variáveis de ambiente
+    (None se ORCHESTRATOR_JOURNAL_PATH não estiver definido ou se o arquivo já
+    estiver aberto por outro processo)
+    """
+    global _task_journal_instance
+
+    path = os.getenv('ORCHESTRATOR_JOURNAL_PATH')
+    if not path:
+        return None
+
+    if _task_journal_instance is None:
+        try:
+            _task_journal_instance = TaskJournal(
+                path,
+                fsync=os.getenv('ORCHESTRATOR_JOURNAL_FSYNC', '0') == '1',
+                compact_every=int(os.getenv('ORCHESTRATOR_JOURNAL_COMPACT_EVERY', '1000'))
+            )
+        except JournalLockedError as e:
+            logger.warning(f"⚠️ {e}; journal desativado neste processo")
+            return None
+
+    return _task_journal_instance
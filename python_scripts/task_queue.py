@@ -0,0 +1,662 @@
+#!/usr/bin/env python3
+"""
+Fila de Tarefas Durável para Orquestração Multi-IA
+submit() grava a tarefa na fila e devolve o task_id na hora; processos worker
+consomem por prioridade (complexidade e plano do usuário) e executam
+process_task. Tarefas em execução ficam sob um visibility timeout renovado
+por heartbeat: se o worker cair, a tarefa volta para a fila e é reexecutada
+com o mesmo task_id (a gravação em ai_task_executions é idempotente).
+
+Backends: SQLite (nó único e testes) ou Redis (docker-compose).
+
+Uso:
+    python task_queue.py worker [--processes N]
+    python task_queue.py submit "texto da tarefa" [--user-id ID] [--user-tier TIER]
+    python task_queue.py status TASK_ID
+    python task_queue.py stats
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import logging
+import sqlite3
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Any, List, Optional
+
+try:
+    # Backend Redis (opcional)
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(Enum):
+    """Status de uma tarefa na fila"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+# Peso do plano do usuário na prioridade (somado à complexidade, 0-100)
+USER_TIER_WEIGHTS = {
+    'free': 0,
+    'pro': 100,
+    'enterprise': 200,
+}
+
+
+def job_priority(complexity: float, user_tier: Optional[str] = None) -> float:
+    """Prioridade da tarefa: plano do usuário primeiro, depois complexidade"""
+    return USER_TIER_WEIGHTS.get(user_tier or 'free', 0) + complexity
+
+
+@dataclass
+class QueuedJob:
+    """Tarefa na fila"""
+    job_id: str
+    payload: Dict[str, Any]
+    priority: float
+    attempts: int = 0
+    max_attempts: int = 3
+    status: str = JobStatus.QUEUED.value
+    worker: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class TaskQueueBackend(ABC):
+    """
+    Armazenamento da fila
+
+    claim() entrega a tarefa de maior prioridade com uma lease de
+    visibility_timeout segundos. complete(), fail() e extend() só têm efeito
+    se a lease ainda pertence ao worker (mesmo worker e mesma tentativa):
+    um worker que perdeu a lease não sobrescreve a reexecução.
+    """
+
+    @abstractmethod
+    def enqueue(self, job: QueuedJob):
+        pass
+
+    @abstractmethod
+    def claim(self, worker_id: str, visibility_timeout: float) -> Optional[QueuedJob]:
+        pass
+
+    @abstractmethod
+    def extend(self, job: QueuedJob, visibility_timeout: float) -> bool:
+        pass
+
+    @abstractmethod
+    def complete(self, job: QueuedJob, result: Dict[str, Any]) -> bool:
+        pass
+
+    @abstractmethod
+    def fail(self, job: QueuedJob, error: str, retry_delay: Optional[float]) -> bool:
+        """retry_delay=None: falha definitiva; senão volta à fila após o atraso (se houver tentativas)"""
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        pass
+
+
+class SQLiteTaskQueue(TaskQueueBackend):
+    """Fila em SQLite (WAL); seguro entre processos do mesmo host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Uma conexão por thread (heartbeat roda em outra thread)
+        self._local = threading.local()
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS task_queue (
+                id TEXT PRIMARY KEY,
+                priority REAL NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_until REAL,
+                worker TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_task_queue_ready
+                ON task_queue(status, priority DESC, created_at);
+            CREATE INDEX IF NOT EXISTS idx_task_queue_lease
+                ON task_queue(status, lease_until);
+        """)
+        logger.info(f"✅ Fila de tarefas SQLite: {path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, query: str, params: tuple) -> int:
+        return self._conn().execute(query, params).rowcount
+
+    def enqueue(self, job: QueuedJob):
+        now = time.time()
+        self._write(
+            "INSERT INTO task_queue (id, priority, payload, status, attempts, max_attempts, "
+            "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)",
+            (job.job_id, job.priority, json.dumps(job.payload, ensure_ascii=False),
+             JobStatus.QUEUED.value, job.max_attempts, now, now, now)
+        )
+
+    def claim(self, worker_id: str, visibility_timeout: float) -> Optional[QueuedJob]:
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE: apenas um processo seleciona e marca por vez
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Leases expiradas (worker caiu): sem tentativas restantes viram falha, as demais voltam
+            conn.execute(
+                "UPDATE task_queue SET status = ?, error = ?, lease_until = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_until < ? AND attempts >= max_attempts",
+                (JobStatus.FAILED.value, "Visibility timeout excedido", now, JobStatus.RUNNING.value, now)
+            )
+            conn.execute(
+                "UPDATE task_queue SET status = ?, lease_until = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_until < ?",
+                (JobStatus.QUEUED.value, now, JobStatus.RUNNING.value, now)
+            )
+            row = conn.execute(
+                "SELECT * FROM task_queue WHERE status = ? AND available_at <= ? "
+                "ORDER BY priority DESC, created_at LIMIT 1",
+                (JobStatus.QUEUED.value, now)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE task_queue SET status = ?, attempts = attempts + 1, lease_until = ?, "
+                    "worker = ?, updated_at = ? WHERE id = ?",
+                    (JobStatus.RUNNING.value, now + visibility_timeout, worker_id, now, row['id'])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        job = self._row_to_job(row)
+        job.attempts += 1
+        job.status = JobStatus.RUNNING.value
+        job.worker = worker_id
+        return job
+
+    # Condição de posse da lease (mesmo worker e mesma tentativa)
+    _OWNED = "id = ? AND status = 'running' AND worker = ? AND attempts = ?"
+
+    def extend(self, job: QueuedJob, visibility_timeout: float) -> bool:
+        now = time.time()
+        return self._write(
+            f"UPDATE task_queue SET lease_until = ?, updated_at = ? WHERE {self._OWNED}",
+            (now + visibility_timeout, now, job.job_id, job.worker, job.attempts)
+        ) == 1
+
+    def complete(self, job: QueuedJob, result: Dict[str, Any]) -> bool:
+        return self._write(
+            f"UPDATE task_queue SET status = ?, result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+            f"WHERE {self._OWNED}",
+            (JobStatus.DONE.value, json.dumps(result, ensure_ascii=False, default=str), time.time(),
+             job.job_id, job.worker, job.attempts)
+        ) == 1
+
+    def fail(self, job: QueuedJob, error: str, retry_delay: Optional[float]) -> bool:
+        now = time.time()
+        if retry_delay is not None and job.attempts < job.max_attempts:
+            status, available_at = JobStatus.QUEUED.value, now + retry_delay
+        else:
+            status, available_at = JobStatus.FAILED.value, now
+        return self._write(
+            f"UPDATE task_queue SET status = ?, error = ?, available_at = ?, lease_until = NULL, "
+            f"updated_at = ? WHERE {self._OWNED}",
+            (status, error, available_at, now, job.job_id, job.worker, job.attempts)
+        ) == 1
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        row = self._conn().execute("SELECT * FROM task_queue WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) AS total FROM task_queue GROUP BY status")
+        return {row['status']: row['total'] for row in rows}
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> QueuedJob:
+        return QueuedJob(
+            job_id=row['id'],
+            payload=json.loads(row['payload']),
+            priority=row['priority'],
+            attempts=row['attempts'],
+            max_attempts=row['max_attempts'],
+            status=row['status'],
+            worker=row['worker'],
+            result=json.loads(row['result']) if row['result'] else None,
+            error=row['error']
+        )
+
+
+class RedisTaskQueue(TaskQueueBackend):
+    """
+    Fila em Redis
+
+    {prefix}:ready   ZSET por prioridade (score = -prioridade × 1e10 + criação)
+    {prefix}:delayed ZSET de retries por horário de liberação
+    {prefix}:leases  ZSET de tarefas em execução por fim da lease
+    {prefix}:job:ID  HASH com payload, tentativas, status e resultado
+
+    As transições rodam em scripts Lua (atômicas entre workers).
+    """
+
+    # Libera retries vencidos, devolve leases expiradas e entrega a próxima tarefa
+    _CLAIM = """
+        local now = tonumber(ARGV[1])
+        local job_prefix = ARGV[4]
+        for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+            redis.call('ZREM', KEYS[2], id)
+            redis.call('ZADD', KEYS[1], redis.call('HGET', job_prefix .. id, 'score'), id)
+        end
+        for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)) do
+            local key = job_prefix .. id
+            redis.call('ZREM', KEYS[3], id)
+            if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(redis.call('HGET', key, 'max_attempts')) then
+                redis.call('HSET', key, 'status', 'failed', 'error', 'Visibility timeout excedido')
+                redis.call('EXPIRE', key, ARGV[5])
+            else
+                redis.call('HSET', key, 'status', 'queued')
+                redis.call('ZADD', KEYS[1], redis.call('HGET', key, 'score'), id)
+            end
+        end
+        local popped = redis.call('ZPOPMIN', KEYS[1])
+        if #popped == 0 then
+            return false
+        end
+        local id = popped[1]
+        redis.call('ZADD', KEYS[3], ARGV[2], id)
+        redis.call('HINCRBY', job_prefix .. id, 'attempts', 1)
+        redis.call('HSET', job_prefix .. id, 'status', 'running', 'worker', ARGV[3])
+        return id
+    """
+
+    # Prefixo comum: só altera a tarefa se a lease pertence ao worker/tentativa
+    _OWNED = """
+        if redis.call('HGET', KEYS[2], 'status') ~= 'running'
+            or redis.call('HGET', KEYS[2], 'worker') ~= ARGV[1]
+            or redis.call('HGET', KEYS[2], 'attempts') ~= ARGV[2] then
+            return 0
+        end
+    """
+
+    # KEYS: leases, job, delayed | ARGV: worker, tentativa, id, ...
+    _EXTEND = _OWNED + """
+        redis.call('ZADD', KEYS[1], ARGV[4], ARGV[3])
+        return 1
+    """
+
+    _COMPLETE = _OWNED + """
+        redis.call('ZREM', KEYS[1], ARGV[3])
+        redis.call('HSET', KEYS[2], 'status', 'done', 'result', ARGV[4])
+        redis.call('HDEL', KEYS[2], 'error')
+        redis.call('EXPIRE', KEYS[2], ARGV[5])
+        return 1
+    """
+
+    _FAIL = _OWNED + """
+        redis.call('ZREM', KEYS[1], ARGV[3])
+        redis.call('HSET', KEYS[2], 'error', ARGV[4])
+        if ARGV[5] ~= '' and tonumber(redis.call('HGET', KEYS[2], 'attempts'))
+                < tonumber(redis.call('HGET', KEYS[2], 'max_attempts')) then
+            redis.call('HSET', KEYS[2], 'status', 'queued')
+            redis.call('ZADD', KEYS[3], ARGV[5], ARGV[3])
+        else
+            redis.call('HSET', KEYS[2], 'status', 'failed')
+            redis.call('EXPIRE', KEYS[2], ARGV[6])
+        end
+        return 1
+    """
+
+    def __init__(self, url: str, prefix: str = 'orchestrator:queue', result_ttl: int = 86400):
+        if redis is None:
+            raise ImportError("Backend Redis requer o pacote redis (pip install redis)")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.result_ttl = result_ttl
+        self._ready = f"{prefix}:ready"
+        self._delayed = f"{prefix}:delayed"
+        self._leases = f"{prefix}:leases"
+        self._job_prefix = f"{prefix}:job:"
+        self._claim = self.client.register_script(self._CLAIM)
+        self._extend = self.client.register_script(self._EXTEND)
+        self._complete = self.client.register_script(self._COMPLETE)
+        self._fail = self.client.register_script(self._FAIL)
+        logger.info(f"✅ Fila de tarefas Redis: {prefix}")
+
+    def _job_keys(self, job: QueuedJob) -> List[str]:
+        return [self._leases, self._job_prefix + job.job_id, self._delayed]
+
+    def enqueue(self, job: QueuedJob):
+        score = -job.priority * 1e10 + time.time()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self._job_prefix + job.job_id, mapping={
+            'payload': json.dumps(job.payload, ensure_ascii=False),
+            'priority': job.priority,
+            'score': score,
+            'attempts': 0,
+            'max_attempts': job.max_attempts,
+            'status': JobStatus.QUEUED.value
+        })
+        pipe.zadd(self._ready, {job.job_id: score})
+        pipe.execute()
+
+    def claim(self, worker_id: str, visibility_timeout: float) -> Optional[QueuedJob]:
+        now = time.time()
+        job_id = self._claim(
+            keys=[self._ready, self._delayed, self._leases],
+            args=[now, now + visibility_timeout, worker_id, self._job_prefix, self.result_ttl]
+        )
+        return self.get(job_id) if job_id else None
+
+    def extend(self, job: QueuedJob, visibility_timeout: float) -> bool:
+        return self._extend(
+            keys=self._job_keys(job),
+            args=[job.worker, job.attempts, job.job_id, time.time() + visibility_timeout]
+        ) == 1
+
+    def complete(self, job: QueuedJob, result: Dict[str, Any]) -> bool:
+        return self._complete(
+            keys=self._job_keys(job),
+            args=[job.worker, job.attempts, job.job_id,
+                  json.dumps(result, ensure_ascii=False, default=str), self.result_ttl]
+        ) == 1
+
+    def fail(self, job: QueuedJob, error: str, retry_delay: Optional[float]) -> bool:
+        available_at = time.time() + retry_delay if retry_delay is not None else ''
+        return self._fail(
+            keys=self._job_keys(job),
+            args=[job.worker, job.attempts, job.job_id, error, available_at, self.result_ttl]
+        ) == 1
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        data = self.client.hgetall(self._job_prefix + job_id)
+        if not data:
+            return None
+        return QueuedJob(
+            job_id=job_id,
+            payload=json.loads(data['payload']),
+            priority=float(data['priority']),
+            attempts=int(data['attempts']),
+            max_attempts=int(data['max_attempts']),
+            status=data['status'],
+            worker=data.get('worker'),
+            result=json.loads(data['result']) if data.get('result') else None,
+            error=data.get('error')
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            JobStatus.QUEUED.value: self.client.zcard(self._ready) + self.client.zcard(self._delayed),
+            JobStatus.RUNNING.value: self.client.zcard(self._leases)
+        }
+
+
+class TaskQueue:
+    """Fila de tarefas do orquestrador (submissão e consulta)"""
+
+    def __init__(self, backend: TaskQueueBackend, max_attempts: int = 3,
+                 visibility_timeout: float = 300, retry_delay: float = 5):
+        """
+        Args:
+            backend: Armazenamento da fila
+            max_attempts: Execuções por tarefa (inclui reentregas por lease expirada)
+            visibility_timeout: Duração da lease de uma tarefa em execução (segundos)
+            retry_delay: Atraso base do retry após erro (dobra a cada tentativa)
+        """
+        self.backend = backend
+        self.max_attempts = max_attempts
+        self.visibility_timeout = visibility_timeout
+        self.retry_delay = retry_delay
+
+    def submit(self, input_text: str, user_id: Optional[int] = None,
+               context: Optional[Dict] = None, user_tier: Optional[str] = None,
+               priority: Optional[float] = None) -> str:
+        """
+        Enfileira a tarefa e retorna o task_id (mesmo ID de ai_task_executions)
+
+        Sem prioridade explícita, usa a complexidade estimada e o plano do
+        usuário (user_tier ou context['user_tier']).
+        """
+        if priority is None:
+            from orchestrator import ComplexityAnalyzer
+            complexity, _ = ComplexityAnalyzer.analyze(input_text, context)
+            priority = job_priority(complexity, user_tier or (context or {}).get('user_tier'))
+
+        task_id = str(uuid.uuid4())
+        self.backend.enqueue(QueuedJob(
+            job_id=task_id,
+            payload={'input_text': input_text, 'user_id': user_id, 'context': context},
+            priority=priority,
+            max_attempts=self.max_attempts
+        ))
+        logger.info(f"📥 Tarefa {task_id} enfileirada (prioridade {priority:.1f})")
+        return task_id
+
+    def status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Status, tentativas e resultado (formato de process_task) da tarefa"""
+        job = self.backend.get(task_id)
+        if job is None:
+            return None
+        return {
+            'task_id': job.job_id,
+            'status': job.status,
+            'priority': job.priority,
+            'attempts': job.attempts,
+            'result': job.result,
+            'error': job.error
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Quantidade de tarefas por status"""
+        return self.backend.stats()
+
+
+class TaskWorker:
+    """Consome a fila e executa as tarefas com o orquestrador"""
+
+    def __init__(self, queue: TaskQueue, orchestrator, worker_id: Optional[str] = None,
+                 poll_interval: float = 1.0):
+        self.queue = queue
+        self.orchestrator = orchestrator
+        self.worker_id = worker_id or f"{os.uname().nodename}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+
+    def run(self, stop_event: threading.Event):
+        """Loop até stop_event (a tarefa em andamento termina antes de sair)"""
+        logger.info(f"👷 Worker {self.worker_id} iniciado")
+        while not stop_event.is_set():
+            job = self.queue.backend.claim(self.worker_id, self.queue.visibility_timeout)
+            if job is None:
+                stop_event.wait(self.poll_interval)
+                continue
+            self.process(job)
+        logger.info(f"👷 Worker {self.worker_id} encerrado")
+
+    def _retry_delay(self, job: QueuedJob) -> float:
+        """Backoff exponencial pela tentativa atual"""
+        return self.queue.retry_delay * 2 ** (job.attempts - 1)
+
+    def process(self, job: QueuedJob):
+        """Executa uma tarefa renovando a lease até o fim"""
+        backend = self.queue.backend
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(self.queue.visibility_timeout / 3):
+                if not backend.extend(job, self.queue.visibility_timeout):
+                    logger.warning(f"⚠️ Lease da tarefa {job.job_id} perdida (será reexecutada)")
+                    return
+
+        threading.Thread(target=heartbeat, name='task-queue-heartbeat', daemon=True).start()
+        payload = job.payload
+        logger.info(f"⚙️ Executando tarefa {job.job_id} (tentativa {job.attempts}/{job.max_attempts})")
+        try:
+            result = self.orchestrator.process_task(
+                payload['input_text'], payload.get('user_id'), payload.get('context'),
+                task_id=job.job_id
+            )
+        except Exception as e:
+            done.set()
+            logger.error(f"❌ Erro na tarefa {job.job_id}: {e}")
+            backend.fail(job, str(e), self._retry_delay(job))
+            return
+        done.set()
+        if result.get('success') is False:
+            # Falha do provider (após as escalações): process_task não levanta exceção
+            logger.error(f"❌ Tarefa {job.job_id} falhou: {result.get('error')}")
+            backend.fail(job, result.get('error') or 'Falha na execução', self._retry_delay(job))
+            return
+        if not backend.complete(job, result):
+            logger.warning(f"⚠️ Resultado da tarefa {job.job_id} descartado: lease expirada")
+
+
+# Singleton global
+_task_queue_instance = None
+
+def get_task_queue() -> TaskQueue:
+    """
+    Retorna instância singleton configurada por variáveis de ambiente
+    ORCHESTRATOR_QUEUE_BACKEND=sqlite (padrão) | redis
+    """
+    global _task_queue_instance
+
+    if _task_queue_instance is None:
+        backend_name = os.getenv('ORCHESTRATOR_QUEUE_BACKEND', 'sqlite')
+        if backend_name == 'redis':
+            backend = RedisTaskQueue(
+                os.getenv('ORCHESTRATOR_QUEUE_REDIS_URL') or os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+                prefix=os.getenv('ORCHESTRATOR_QUEUE_REDIS_PREFIX', 'orchestrator:queue'),
+                result_ttl=int(os.getenv('ORCHESTRATOR_QUEUE_RESULT_TTL', '86400'))
+            )
+        elif backend_name == 'sqlite':
+            backend = SQLiteTaskQueue(os.getenv('ORCHESTRATOR_QUEUE_SQLITE_PATH', '/tmp/orchestrator_queue.db'))
+        else:
+            raise ValueError(f"Backend de fila desconhecido: {backend_name}")
+
+        _task_queue_instance = TaskQueue(
+            backend,
+            max_attempts=int(os.getenv('ORCHESTRATOR_QUEUE_MAX_ATTEMPTS', '3')),
+            visibility_timeout=float(os.getenv('ORCHESTRATOR_QUEUE_VISIBILITY_TIMEOUT', '300')),
+            retry_delay=float(os.getenv('ORCHESTRATOR_QUEUE_RETRY_DELAY', '5'))
+        )
+
+    return _task_queue_instance
+
+
+def _worker_main(stop_event, index: int):
+    """
+    Processo worker: orquestrador próprio (pool de conexões por processo)
+    O journal de tarefas ganha o sufixo .worker<index>: o worker que substitui
+    um que caiu recupera as tarefas dele, sem tocar as dos outros workers.
+    """
+    from orchestrator import AIOrchestrator
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    journal_path = os.getenv('ORCHESTRATOR_JOURNAL_PATH')
+    if journal_path:
+        os.environ['ORCHESTRATOR_JOURNAL_PATH'] = f"{journal_path}.worker{index}"
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        raise ValueError("DATABASE_URL não configurada")
+    TaskWorker(get_task_queue(), AIOrchestrator(database_url)).run(stop_event)
+
+
+def run_worker_pool(processes: int):
+    """
+    Inicia N processos worker e os reinicia se caírem
+    SIGTERM/SIGINT: cada worker termina a tarefa atual e sai
+    """
+    stop_event = multiprocessing.Event()
+
+    def stop(signum, frame):
+        logger.info("🛑 Encerrando workers após as tarefas em andamento...")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    def start(index: int):
+        process = multiprocessing.Process(target=_worker_main, args=(stop_event, index), daemon=False)
+        process.start()
+        return process
+
+    workers = [start(i) for i in range(processes)]
+    logger.info(f"🏭 {processes} worker(s) iniciados")
+    while not stop_event.is_set():
+        stop_event.wait(1)
+        for i, process in enumerate(workers):
+            if not process.is_alive() and not stop_event.is_set():
+                logger.warning(f"⚠️ Worker {process.pid} saiu (código {process.exitcode}), reiniciando")
+                workers[i] = start(i)
+    for process in workers:
+        process.join()
+
+
+def main():
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Fila de tarefas do orquestrador")
+    commands = parser.add_subparsers(dest='command', required=True)
+    worker = commands.add_parser('worker', help="Inicia processos worker")
+    worker.add_argument('--processes', type=int,
+                        default=int(os.getenv('ORCHESTRATOR_QUEUE_WORKERS', '2')))
+    submit = commands.add_parser('submit', help="Enfileira uma tarefa")
+    submit.add_argument('input_text')
+    submit.add_argument('--user-id', type=int)
+    submit.add_argument('--user-tier', choices=sorted(USER_TIER_WEIGHTS))
+    status = commands.add_parser('status', help="Consulta uma tarefa")
+    status.add_argument('task_id')
+    commands.add_parser('stats', help="Tarefas por status")
+    args = parser.parse_args()
+
+    if args.command == 'worker':
+        run_worker_pool(args.processes)
+    elif args.command == 'submit':
+        print(get_task_queue().submit(args.input_text, args.user_id, user_tier=args.user_tier))
+    elif args.command == 'status':
+        result = get_task_queue().status(args.task_id)
+        if result is None:
+            print(f"❌ Tarefa não encontrada: {args.task_id}")
+            sys.exit(1)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command == 'stats':
+        print(json.dumps(get_task_queue().stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
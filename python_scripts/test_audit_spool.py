@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Testes do AuditSpool com mais de um processo no mesmo diretório
+Não usa rede nem banco: roda junto com bench_orchestrator.py.
+
+Uso:
+    python -m pytest -q test_audit_spool.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import audit_spool
+from audit_spool import AuditSpool
+
+
+def event(event_id: str) -> tuple:
+    return (event_id, datetime(2026, 1, 1, 12, 0, 0), 'task_submitted', '{}')
+
+
+class SharedSpoolDirectoryTest(unittest.TestCase):
+    """Dois spools (processos) no mesmo diretório não perdem eventos um do outro"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.first = AuditSpool(self.directory)
+        self.second = AuditSpool(self.directory)
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        shutil.rmtree(self.directory)
+
+    def replay(self, spool: AuditSpool) -> list:
+        """Recarga como em AuditLogger.replay: lê e apaga os segmentos fechados"""
+        spool.seal()
+        replayed = []
+        for path in spool.sealed_segments():
+            replayed += [row[0] for row in spool.read_segment(path)]
+            spool.remove_segment(path)
+        return replayed
+
+    def test_segment_names_do_not_collide(self):
+        self.first.append([event('a1')])
+        self.second.append([event('b1')])
+        names = os.listdir(self.directory)
+        self.assertEqual(len(names), 2)
+
+    def test_replay_skips_live_segments_of_other_spool(self):
+        self.first.append([event('a1')])
+        self.second.append([event('b1')])
+
+        self.assertEqual(self.replay(self.first), ['a1'])
+
+        # O segmento ativo do segundo spool continua intacto e recebendo eventos
+        self.second.append([event('b2')])
+        self.assertEqual(self.replay(self.second), ['b1', 'b2'])
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_closed_spool_segments_are_replayed_by_other(self):
+        self.first.append([event('a1'), event('a2')])
+        self.first.close()
+        self.assertEqual(self.replay(self.second), ['a1', 'a2'])
+
+    @unittest.skipIf(audit_spool.fcntl is None, "recuperação de segmentos órfãos requer fcntl")
+    def test_orphan_segment_of_crashed_spool_is_claimed(self):
+        self.first.append([event('a1')])
+        # Queda do processo: o lock é liberado sem renomear o segmento
+        self.first._file.close()
+        self.first._file = None
+        self.first._active_path = None
+        self.assertEqual(self.replay(self.second), ['a1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
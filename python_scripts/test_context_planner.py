@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Testes do ContextPlanner (map-reduce de entradas acima do orçamento)
+Não usa rede nem banco: roda junto com bench_orchestrator.py.
+
+Uso:
+    python -m pytest -q test_context_planner.py
+"""
+
+import math
+import unittest
+
+from orchestrator import AIProvider, ContextPlanner
+
+
+def make_provider(max_context_tokens: int) -> AIProvider:
+    return AIProvider(
+        id=1, name='claude_haiku', display_name='Claude Haiku', type='anthropic',
+        api_endpoint=None, status='active', priority=1,
+        cost_per_1k_input_tokens=0.0, cost_per_1k_output_tokens=0.0,
+        max_context_tokens=max_context_tokens, supports_streaming=False,
+        supports_tools=False, capabilities={}
+    )
+
+
+class ReduceConvergenceTest(unittest.TestCase):
+    """O loop de reduce de _execute_planned termina mesmo com parciais enormes"""
+
+    def setUp(self):
+        self.planner = ContextPlanner(output_reserve_tokens=4096, max_input_tokens=2000,
+                                      head_chars=200, max_chunks=32)
+        self.provider = make_provider(200000)
+        self.text = "Resuma o relatório. " * 2000
+
+    def reduce(self, partials):
+        """Simula o loop de _execute_planned com um provider que responde no limite da saída"""
+        rounds = 0
+        outputs = partials
+        while len(outputs) > 1:
+            prompts = self.planner.reduce_groups(self.text, outputs, self.provider)
+            for prompt in prompts:
+                self.assertLessEqual(
+                    self.planner.estimate_tokens(prompt),
+                    self.planner.input_budget(self.provider)
+                )
+            self.assertLessEqual(len(prompts), math.ceil(len(outputs) / 2))
+            outputs = ['x' * 4096 * ContextPlanner.CHARS_PER_TOKEN for _ in prompts]
+            rounds += 1
+        return rounds
+
+    def test_oversized_partials_converge(self):
+        partials = ['x' * 4096 * ContextPlanner.CHARS_PER_TOKEN for _ in range(9)]
+        rounds = self.reduce(partials)
+        self.assertLessEqual(rounds, math.ceil(math.log2(len(partials))))
+
+    def test_oversized_partials_are_truncated(self):
+        partials = ['x' * 4096 * ContextPlanner.CHARS_PER_TOKEN for _ in range(2)]
+        prompts = self.planner.reduce_groups(self.text, partials, self.provider)
+        self.assertEqual(len(prompts), 1)
+        self.assertEqual(prompts[0].count(ContextPlanner.TRUNCATED_MARK), 2)
+
+    def test_tiny_budget_still_pairs_partials(self):
+        planner = ContextPlanner(output_reserve_tokens=4096, max_input_tokens=10, head_chars=200)
+        partials = ['resposta parcial'] * 4
+        prompts = planner.reduce_groups(self.text, partials, self.provider)
+        self.assertEqual(len(prompts), 2)
+
+    def test_small_partials_fit_one_prompt(self):
+        partials = ['resposta parcial'] * 5
+        prompts = self.planner.reduce_groups(self.text, partials, self.provider)
+        self.assertEqual(len(prompts), 1)
+        self.assertNotIn(ContextPlanner.TRUNCATED_MARK, prompts[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Testes do TaskJournal com mais de um processo configurado no mesmo caminho
+Não usa rede nem banco: roda junto com bench_orchestrator.py.
+
+Uso:
+    python -m pytest -q test_task_journal.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import task_journal
+from task_journal import JournalLockedError, TaskJournal, get_task_journal
+
+
+@unittest.skipIf(task_journal.fcntl is None, "lock de journal requer fcntl")
+class SharedJournalPathTest(unittest.TestCase):
+    """Dois journals no mesmo caminho não recuperam nem compactam tarefas um do outro"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'journal.jsonl')
+
+    def tearDown(self):
+        task_journal._task_journal_instance = None
+        shutil.rmtree(self.directory)
+
+    def test_second_journal_on_same_path_is_rejected(self):
+        first = TaskJournal(self.path)
+        try:
+            with self.assertRaises(JournalLockedError):
+                TaskJournal(self.path)
+        finally:
+            first.close()
+
+    def test_lock_survives_compaction(self):
+        first = TaskJournal(self.path, compact_every=1)
+        try:
+            first.append('begin', 'a', {'task_id': 'a'})
+            first.append('commit', 'a')
+            with self.assertRaises(JournalLockedError):
+                TaskJournal(self.path)
+        finally:
+            first.close()
+
+    def test_reopen_after_close_recovers_pending(self):
+        first = TaskJournal(self.path)
+        first.append('begin', 'vivo', {'task_id': 'vivo'})
+        first.close()
+        second = TaskJournal(self.path)
+        try:
+            self.assertEqual(list(second.pending()), ['vivo'])
+        finally:
+            second.close()
+
+    def test_get_task_journal_disables_locked_path(self):
+        first = TaskJournal(self.path)
+        try:
+            with mock.patch.dict(os.environ, {'ORCHESTRATOR_JOURNAL_PATH': self.path}):
+                self.assertIsNone(get_task_journal())
+        finally:
+            first.close()
+
+    def test_worker_journals_are_independent(self):
+        workers = [TaskJournal(f"{self.path}.worker{index}", compact_every=1) for index in range(2)]
+        try:
+            workers[0].append('begin', 'w0', {'task_id': 'w0'})
+            workers[1].append('begin', 'w1', {'task_id': 'w1'})
+            workers[1].append('begin', 'w1-done', {'task_id': 'w1-done'})
+            workers[1].append('commit', 'w1-done')
+            self.assertEqual(list(workers[0].pending()), ['w0'])
+            self.assertEqual(list(workers[1].pending()), ['w1'])
+        finally:
+            for journal in workers:
+                journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()